@@ -1,8 +1,11 @@
+import sys
+from pathlib import Path
 import numpy as np
 from PIL import Image
 
-ROWS = 480
-COLUMNS = 640
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.raw_io import load_raw
+from imgproc.resample import resize
 
 # Load the RAW image
 source_path = "/home/kimsooyoung/Documents/Study/eecs_203a/hw1/triangle.raw"
@@ -19,21 +22,7 @@ def subsample(image, factor):
 
 def nearest_neighbor_interpolation(image, target_shape):
     """Upscale using nearest neighbor interpolation"""
-
-    row, col = image.shape
-    target_row, target_col = target_shape
-    row_scale = target_row / row
-    col_scale = target_col / col
-
-    output_img = np.empty(target_shape, dtype=image.dtype)
-
-    for i in range(target_row):
-        for j in range(target_col):
-            original_row = int(i / row_scale)
-            original_col = int(j / col_scale)
-            output_img[i, j] = image[original_row, original_col]
-
-    return output_img
+    return resize(image, target_shape, method="nearest")
 
 def save_image(image, filename):
     """Save image to PNG using PIL"""
@@ -41,37 +30,35 @@ def save_image(image, filename):
 
 def main(img_name):
     try:
-        with open(f'{img_name}.raw', 'rb') as raw:
-            data = np.frombuffer(raw.read(), dtype=np.uint8)
-            grayscale_image = data.reshape((ROWS, COLUMNS))
-
-            # 1. Subsample the image (4 level)
-            subsample_4 = subsample(grayscale_image, 4)
-            # 2. Subsample the image (16 level)
-            subsample_16 = subsample(grayscale_image, 16)  # 32 x 32
-
-            # 3. Interpolate back using nearest neighbor (4 level)
-            interp_4 = nearest_neighbor_interpolation(
-                subsample_4, (ROWS, COLUMNS)
-            )
-            # 4. Interpolate back using nearest neighbor (16 level)
-            interp_16 = nearest_neighbor_interpolation(
-                subsample_16, (ROWS, COLUMNS)
-            )
-
-            save_image(grayscale_image, "default.png")
-
-            # 5. Save images
-            if img_name == "triangle":
-                save_image(subsample_4, "triangles4.png")
-                save_image(subsample_16, "triangles16.png")
-                save_image(interp_4, "trianglei4.png")
-                save_image(interp_16, "trianglei16.png")
-            elif img_name == "cat":
-                save_image(subsample_4, "cats4.png")
-                save_image(subsample_16, "cats16.png")
-                save_image(interp_4, "cati4.png")
-                save_image(interp_16, "cati16.png")
+        grayscale_image = load_raw(img_name)
+
+        # 1. Subsample the image (4 level)
+        subsample_4 = subsample(grayscale_image, 4)
+        # 2. Subsample the image (16 level)
+        subsample_16 = subsample(grayscale_image, 16)  # 30 x 40
+
+        # 3. Interpolate back using nearest neighbor (4 level)
+        interp_4 = nearest_neighbor_interpolation(
+            subsample_4, grayscale_image.shape
+        )
+        # 4. Interpolate back using nearest neighbor (16 level)
+        interp_16 = nearest_neighbor_interpolation(
+            subsample_16, grayscale_image.shape
+        )
+
+        save_image(grayscale_image, "default.png")
+
+        # 5. Save images
+        if img_name == "triangle":
+            save_image(subsample_4, "triangles4.png")
+            save_image(subsample_16, "triangles16.png")
+            save_image(interp_4, "trianglei4.png")
+            save_image(interp_16, "trianglei16.png")
+        elif img_name == "cat":
+            save_image(subsample_4, "cats4.png")
+            save_image(subsample_16, "cats16.png")
+            save_image(interp_4, "cati4.png")
+            save_image(interp_16, "cati16.png")
     except Exception as e:
         print(f"Error: {e}")
 
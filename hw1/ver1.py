@@ -1,20 +1,20 @@
 import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 from PIL import Image
 
-ROWS = 512
-COLUMNS = 512
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.raw_io import load_raw
+from imgproc.resample import resize
 
 def subsample(image, factor):
     """Subsample image by selecting every nth row and column"""
     return image[::factor, ::factor]
 
 def nearest_neighbor_interpolation(image, target_shape):
-    """Upscale using nearest neighbor interpolation"""
-    zoom_y = target_shape[0] // image.shape[0]
-    zoom_x = target_shape[1] // image.shape[1]
-    return image.repeat(zoom_y, axis=0).repeat(zoom_x, axis=1)
+    """Upscale using nearest neighbor interpolation (any target size, not only integer zooms)"""
+    return resize(image, target_shape, method="nearest")
 
 def save_image(image, filename):
     """Save image to PNG using PIL"""
@@ -29,36 +29,31 @@ def show_image(image, title='Image'):
 
 def main():
     try:
-        with open('cat.raw', 'rb') as f:
-            image = np.fromfile(f, dtype=np.uint64, count=ROWS * COLUMNS)
-            print(f"{image.size=}")
-            # 640*480 = 307,200
-            if image.size != ROWS * COLUMNS: 
-                raise ValueError("Not enough data in input file")
-            image = image.reshape((ROWS, COLUMNS))
-
-            # ✅ Show original image
-            show_image(image, title="Original Image")
-
-            # ✅ Subsample the image
-            subsample_4 = subsample(image, 4)  # 128 x 128
-            subsample_16 = subsample(image, 16)  # 32 x 32
-
-            # ✅ Interpolate back to 512 x 512 using nearest neighbor
-            interp_4 = nearest_neighbor_interpolation(subsample_4, (ROWS, COLUMNS))
-            interp_16 = nearest_neighbor_interpolation(subsample_16, (ROWS, COLUMNS))
-
-            # ✅ Show all images
-            show_image(subsample_4, title="Subsampled by 4 (128x128)")
-            show_image(subsample_16, title="Subsampled by 16 (32x32)")
-            show_image(interp_4, title="Interpolated from 128x128")
-            show_image(interp_16, title="Interpolated from 32x32")
-
-            # ✅ Save images
-            save_image(subsample_4, "subsample_4.png")
-            save_image(subsample_16, "subsample_16.png")
-            save_image(interp_4, "interp_4.png")
-            save_image(interp_16, "interp_16.png")
+        image = load_raw('cat')
+        print(f"{image.shape=}")
+
+        # ✅ Show original image
+        show_image(image, title="Original Image")
+
+        # ✅ Subsample the image
+        subsample_4 = subsample(image, 4)  # 120 x 160
+        subsample_16 = subsample(image, 16)  # 30 x 40
+
+        # ✅ Interpolate back to the original size using nearest neighbor
+        interp_4 = nearest_neighbor_interpolation(subsample_4, image.shape)
+        interp_16 = nearest_neighbor_interpolation(subsample_16, image.shape)
+
+        # ✅ Show all images
+        show_image(subsample_4, title="Subsampled by 4 (120x160)")
+        show_image(subsample_16, title="Subsampled by 16 (30x40)")
+        show_image(interp_4, title="Interpolated from 120x160")
+        show_image(interp_16, title="Interpolated from 30x40")
+
+        # ✅ Save images
+        save_image(subsample_4, "subsample_4.png")
+        save_image(subsample_16, "subsample_16.png")
+        save_image(interp_4, "interp_4.png")
+        save_image(interp_16, "interp_16.png")
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
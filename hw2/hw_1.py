@@ -1,30 +1,31 @@
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 from PIL import Image
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.lut import gamma_lut
+from imgproc.raw_io import load_raw
+
 L = 256
 gamma1 = 0.4
 gamma2 = 2.5
 
-ROWS = 480
-COLUMNS = 640
-
 def power_law_transform(gray_level, gamma, L=256):
     tf = int(((gray_level / (L - 1)) ** gamma) * (L - 1))
     return np.clip(np.floor(tf + 0.5), 0, L-1).astype(np.uint8)
 
 def generate_lookup_table(gamma, L=256):
-    lookup_table = np.array([power_law_transform(i, gamma, L) for i in range(L)])
-    return lookup_table
+    # Same values as power_law_transform for every level, computed in one pass and cached
+    return gamma_lut(gamma, L)
 
 def apply_lookup_table(image_array, lookup_table):
     return lookup_table[image_array]
 
 def main(img_name):
     try:
-        with open(f'{img_name}.raw', 'rb') as raw:
-            data = np.frombuffer(raw.read(), dtype=np.uint8)
-            grayscale_image = data.reshape((ROWS, COLUMNS))
+        grayscale_image = load_raw(img_name)
     except Exception as e:
         print(f"Error: {e}")
 
@@ -58,9 +59,7 @@ def draw_lookup_table(plot=False):
 def draw_cat_GLT(transform_1, transform_2, plot=False):
 
     try:
-        with open("cat.raw", "rb") as f:
-            data = np.frombuffer(f.read(), dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw("cat")
     except FileNotFoundError:
         print("Error: 'cat.raw' not found.")
         exit()
@@ -1,24 +1,24 @@
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 from PIL import Image
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.histogram import histogram
+from imgproc.raw_io import load_raw
+
 L = 256
-ROWS = 480
-COLUMNS = 640
 
-def histogram_equalization(image_array):
-    # 1. Calculate the histogram of the input image
-    histogram, bins = np.histogram(image_array.flatten(), bins=L, range=(0, L))
+def histogram_equalization(image_array, hist=None):
+    # 1. Calculate the histogram of the input image (or reuse one computed earlier)
+    if hist is None:
+        hist = histogram(image_array, L)
 
     # 2. Calculate the cumulative distribution function (CDF)
-    cdf = histogram.cumsum()
-
     # 3. Normalize the CDF to the range [0, L-1]
-    cdf_normalized = (cdf - cdf.min()) * (L - 1) / (cdf.max() - cdf.min())
-    cdf_normalized = cdf_normalized.astype(np.uint8)
-
     # 4. Create the mapping function (lookup table)
-    mapping = cdf_normalized
+    mapping = hist.equalization_mapping()
 
     # 5. Apply the mapping to the original image
     equalized_image = mapping[image_array]
@@ -57,9 +57,7 @@ def draw_cat_imgs(original_image, equalized_image):
 if __name__ == "__main__":
 
     try:
-        with open("cat.raw", "rb") as f:
-            data = np.fromfile(f, dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw("cat")
     except FileNotFoundError:
         print("Error: 'cat.raw' not found.")
         exit()
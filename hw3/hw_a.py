@@ -1,33 +1,70 @@
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 
 from PIL import Image
 
-L = 256
-ROWS = 480
-COLUMNS = 640
-
-def apply_averaging_filter(image, size=11):
-    pad = size // 2
-    kernel = np.ones((size, size), dtype=np.float32) / (size * size)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.border import pad
+from imgproc.box import box_sum
+from imgproc.histogram import histogram
+from imgproc.raw_io import load_raw
+from imgproc.workspace import scratch
 
-    # Pad the image using pixel replication
-    padded_image = np.pad(image, pad_width=pad, mode='edge')
-
-    # Prepare output image
-    filtered_image = np.zeros_like(image, dtype=np.float32)
+L = 256
 
-    # Convolution operation
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
-            region = padded_image[i:i+size, j:j+size]
-            filtered_value = np.sum(region * kernel)
-            filtered_image[i, j] = filtered_value
+# Windows that are re-summed in float32 per batch
+REFERENCE_CHUNK = 1 << 12
 
-    return np.clip(filtered_image, 0, 255).astype(np.uint8)
+def _reference_means(image, size, redo, out, workspace=None):
+    """Recompute the windows flagged in `redo` like the reference loop: sum(region * kernel) in float32.
 
-def plot_histogram(image, title):
-    plt.hist(image.ravel(), bins=range(L+1), color='black')
+    A window whose exact mean is a whole number m can sum to just under m
+    in float32 and truncate to m - 1, depending on its pixels, so those
+    windows are summed the same way, a batch of pixels at a time.
+    """
+    kernel = np.ones((size, size), dtype=np.float32) / (size * size)
+    r = size // 2
+    padded = pad(image, r, mode="nearest",
+                 out=scratch(workspace, "average_pad", (image.shape[0] + 2 * r, image.shape[1] + 2 * r), image.dtype))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, (size, size))
+    products = scratch(workspace, "average_products", (REFERENCE_CHUNK, size, size), np.float32)
+    flags = redo.reshape(-1)
+    for start in range(0, flags.size, REFERENCE_CHUNK):
+        chunk = start + np.flatnonzero(flags[start:start + REFERENCE_CHUNK])
+        if chunk.size == 0:
+            continue
+        region = products[:chunk.size]
+        np.multiply(windows[np.divmod(chunk, image.shape[1])], kernel, out=region)
+        values = np.clip(region.sum(axis=(1, 2)), 0, 255)
+        out.flat[chunk] = values
+    return out
+
+def apply_averaging_filter(image, size=11, out=None, workspace=None):
+    # Exact integer box sums from a summed-area table, with pixel
+    # replication at the border; four lookups per pixel whatever the window
+    # size. sum // size^2 is the reference's truncated float32 mean except
+    # for windows whose mean is a whole number, which are redone like the
+    # reference
+    image = np.asarray(image)
+    sums = box_sum(image, size, mode="nearest", workspace=workspace,
+                   out=scratch(workspace, "average", image.shape, np.int64))
+    remainders = scratch(workspace, "average_remainder", image.shape, np.int64)
+    np.divmod(sums, size * size, out=(sums, remainders))
+    redo = np.equal(remainders, 0, out=scratch(workspace, "average_redo", image.shape, np.bool_))
+
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+    np.clip(sums, 0, 255, out=sums)
+    np.copyto(out, sums, casting="unsafe")
+    return _reference_means(image, size, redo, out, workspace)
+
+def plot_histogram(image, title, hist=None):
+    # Bin once with bincount and let plt.hist draw the precomputed counts
+    if hist is None:
+        hist = histogram(image, L)
+    plt.hist(np.arange(L), bins=range(L+1), weights=hist.counts, color='black')
     plt.title(title)
     plt.xlabel("Gray Level")
     plt.ylabel("Frequency")
@@ -40,9 +77,7 @@ if __name__ == "__main__":
     image_name = "triangle" 
 
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            data = np.fromfile(f, dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw(image_name)
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
@@ -1,25 +1,28 @@
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 
-L = 256
-ROWS = 480
-COLUMNS = 640
-
-def apply_median_filter(image, size=11):
-    pad = size // 2
-    padded_image = np.pad(image, pad_width=pad, mode='edge')
-    filtered_image = np.zeros_like(image)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.histogram import histogram
+from imgproc.raw_io import load_raw
+from imgproc.rank import median_filter
 
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
-            region = padded_image[i:i+size, j:j+size]
-            median_value = np.median(region)
-            filtered_image[i, j] = median_value
+L = 256
 
-    return filtered_image.astype(np.uint8)
+def apply_median_filter(image, size=11, out=None, workspace=None):
+    # Sliding window counts with pixel replication at the border; the cost per
+    # pixel does not depend on the window size. The median of a uint8 image
+    # is already uint8, so it is written straight into `out`
+    if out is None and np.asarray(image).dtype != np.uint8:
+        return median_filter(image, size, mode="nearest", workspace=workspace).astype(np.uint8)
+    return median_filter(image, size, mode="nearest", out=out, workspace=workspace)
 
-def plot_histogram(image, title):
-    plt.hist(image.ravel(), bins=range(L+1), color='black')
+def plot_histogram(image, title, hist=None):
+    # Bin once with bincount and let plt.hist draw the precomputed counts
+    if hist is None:
+        hist = histogram(image, L)
+    plt.hist(np.arange(L), bins=range(L+1), weights=hist.counts, color='black')
     plt.title(title)
     plt.xlabel("Gray Level")
     plt.ylabel("Frequency")
@@ -32,9 +35,7 @@ if __name__ == "__main__":
     image_name = "triangle" 
 
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            data = np.fromfile(f, dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw(image_name)
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
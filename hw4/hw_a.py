@@ -1,54 +1,68 @@
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.signal import convolve2d
 
-L = 256
-ROWS = 480
-COLUMNS = 640
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc import kernels
+from imgproc.graph import Graph
 
-def apply_laplacian_filter(image):
-    print(f"minumum value from Image: {np.min(image)}")
+L = 256
 
-    # Define 3x3 Laplacian filter with -8 in the center
-    kernel = np.array([[1, 1, 1],
-                       [1, -8, 1],
-                       [1, 1, 1]], dtype=np.int32)
+def laplacian_response(image):
+    # 3x3 Laplacian filter with -8 in the center
+    kernel = kernels.laplacian(8)
     
     image = image.astype(np.float32)
 
-    filtered = convolve2d(image, kernel, mode='valid')
+    return convolve2d(image, kernel, mode='valid')
 
+def rescale_to_uint8(filtered, out=None):
+    # Shift so the smallest value becomes zero, then stretch to 0-255, in
+    # place in `filtered`; the cast goes into `out` when one is given
     filtered -= filtered.min()
     if filtered.max() > 0:
         filtered *= (255.0 / filtered.max())
 
-    return filtered.astype(np.uint8)
+    if out is None:
+        return filtered.astype(np.uint8)
+    np.copyto(out, filtered, casting="unsafe")
+    return out
+
+def apply_laplacian_filter(image):
+    print(f"minumum value from Image: {np.min(image)}")
+
+    return rescale_to_uint8(laplacian_response(image))
 
 def apply_sharpening_filter(image):
-    # Define 3x3 Laplacian filter with -8 in the center
-    kernel = np.array([[-1, -1, -1],
-                       [-1, 9, -1],
-                       [-1, -1, -1]], dtype=np.int32)
+    # 3x3 sharpening filter: 9 in the center of -1s (identity minus Laplacian)
+    kernel = kernels.sharpen(8)
     
     image = image.astype(np.float32)
 
     filtered = convolve2d(image, kernel, mode='valid')
 
-    filtered -= filtered.min()
-    if filtered.max() > 0:
-        filtered *= (255.0 / filtered.max())
-
-    return filtered.astype(np.uint8)
+    return rescale_to_uint8(filtered)
 
 if __name__ == "__main__":
 
     # image_name = "cat" 
     image_name = "triangle" 
 
+    # Nothing below is computed until a panel is drawn; remove a name from
+    # `show` to skip that filter entirely
+    show = ("Laplacian", "Sharpened")
+
+    graph = Graph()
+    image = graph.load(image_name)
+    filtered = {
+        "Laplacian": image.then(apply_laplacian_filter),
+        "Sharpened": image.then(apply_sharpening_filter),
+    }
+
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            data = np.fromfile(f, dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        image.value()
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
@@ -56,23 +70,13 @@ if __name__ == "__main__":
         print(f"Error loading '{image_name}.raw': {e}")
         exit()
 
-    # Apply Laplacian filter using convolve2d
-    laplacian_image = apply_laplacian_filter(original_image)
-
-    # Apply sharpening filter
-    sharpened_image = apply_sharpening_filter(original_image)
-
     # Show images
-    plt.figure(figsize=(12, 6))
-
-    plt.subplot(1, 2, 1)
-    plt.imshow(laplacian_image, cmap='gray')
-    plt.title(f"Laplacian Image {image_name}")
-    plt.axis('off')
+    plt.figure(figsize=(6 * len(show), 6))
 
-    plt.subplot(1, 2, 2)
-    plt.imshow(sharpened_image, cmap='gray')
-    plt.title(f"Sharpened Image {image_name}")
-    plt.axis('off')
+    for i, name in enumerate(show):
+        plt.subplot(1, len(show), i + 1)
+        plt.imshow(filtered[name].value(), cmap='gray')
+        plt.title(f"{name} Image {image_name}")
+        plt.axis('off')
     plt.tight_layout()
     plt.show()
@@ -1,15 +1,18 @@
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.raw_io import load_raw
+from imgproc.spectral import Spectrum
+
 L = 256
-ROWS = 480
-COLUMNS = 640
-
-def compute_dft_magnitude(image):
-    # Compute 2D Fourier Transform
-    f = np.fft.fft2(image)
-    f_shifted = np.fft.fftshift(f)  # Shift DC to center
-    magnitude = np.abs(f_shifted)
+
+def compute_dft_magnitude(image, workers=None):
+    # Real-input 2D Fourier Transform (half the work of fft2); the full
+    # magnitude with DC in the center is rebuilt from it by symmetry
+    magnitude = Spectrum(image, workers=workers).magnitude(shifted=True)
     
     # Use logarithmic scaling for visibility
     magnitude_log = np.log1p(magnitude)  # log(1 + |F(u,v)|)
@@ -25,9 +28,7 @@ if __name__ == "__main__":
     image_name = "triangle" 
 
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            data = np.fromfile(f, dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw(image_name)
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
@@ -1,10 +1,13 @@
+import sys
+from pathlib import Path
 import cv2
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.raw_io import load_raw
+
 L = 256
-ROWS = 480
-COLUMNS = 640
 
 def apply_laplacian_filter(image):
     print(f"minimum value from Image: {np.min(image)}")
@@ -44,9 +47,7 @@ if __name__ == "__main__":
     # image_name = "triangle" 
 
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            data = np.fromfile(f, dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw(image_name)
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
@@ -1,27 +1,28 @@
+import sys
+from pathlib import Path
 import numpy as np 
-from scipy import ndimage
 import matplotlib.pyplot as plt
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.box import box_mean
+from imgproc.raw_io import load_raw
+
 L = 256
-ROWS = 256
-COLUMNS = 256
 
 # def arithmetic_mean_filter(image, size):
 #     kernel = np.ones((size, size), dtype=np.float32) / (size * size)
 #     return convolve2d(image, kernel, mode='same', boundary='symm')
 
 def arithmetic_mean_filter(image: np.ndarray, size: int):
-    kernel = np.ones((size, size), dtype=np.float32) / (size * size)
-    return ndimage.convolve(image, kernel, mode='nearest')
+    # Summed-area table box mean, cost independent of the window size
+    return box_mean(image, size, mode='nearest').astype(image.dtype)
 
 if __name__ == "__main__":
 
     image_name = "stripes" 
 
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            data = np.fromfile(f, dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw(image_name)
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
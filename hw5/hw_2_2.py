@@ -1,10 +1,13 @@
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.ndimage import convolve, median_filter, maximum_filter, minimum_filter
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc.raw_io import load_raw
+
 L = 256
-ROWS = 256
-COLUMNS = 256
 
 class Filter:
 
@@ -94,9 +97,7 @@ if __name__ == "__main__":
     image_name = "stripes"
 
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            data = np.frombuffer(f.read(), dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw(image_name)
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
@@ -1,108 +1,151 @@
+import sys
+from functools import lru_cache
+from pathlib import Path
 import cv2
 import numpy as np
 from PIL import Image
 import matplotlib.pyplot as plt
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc import minmax
+from imgproc.raw_io import load_raw
+from imgproc.workspace import scratch
+
 L = 256
-ROWS = 256
-COLUMNS = 256
+
+@lru_cache(maxsize=32)
+def _ones(size):
+    kernel = np.ones((size, size), dtype=np.float32)
+    kernel.setflags(write=False)
+    return kernel
+
+@lru_cache(maxsize=32)
+def _mean_kernel(size):
+    kernel = _ones(size) / (size*size)
+    kernel.setflags(write=False)
+    return kernel
+
+def _result(values, dtype, out):
+    """values cast (truncated) to dtype, written into `out` when given"""
+    if out is None:
+        return values.astype(dtype)
+    np.copyto(out, values, casting="unsafe")
+    return out
+
+def _float_image(image, eps, workspace):
+    # image.astype(np.float32) + eps, in a workspace buffer
+    img_f = scratch(workspace, "jeff_float", image.shape, np.float32)
+    np.copyto(img_f, image)
+    img_f += eps
+    return img_f
 
 class Filter:
 
-    def mean(image: np.ndarray, size: int):
+    # Every filter writes into `out` when given and takes its float
+    # intermediates from `workspace`, so equal-size frames allocate nothing
+
+    def mean(image: np.ndarray, size: int, out=None, workspace=None):
         # build uniform kernel
-        kernel = np.ones((size, size), dtype=np.float32) / (size*size)
-        return cv2.filter2D(image, ddepth=-1, kernel=kernel)
+        return cv2.filter2D(image, ddepth=-1, kernel=_mean_kernel(size), dst=out)
 
-    def geo_mean(image:np.ndarray, size: int, eps: float = 1e-9):
-        img_f = image.astype(np.float32) + eps
-        logs = np.log(img_f)
+    def geo_mean(image:np.ndarray, size: int, eps: float = 1e-9, out=None, workspace=None):
+        logs = _float_image(image, eps, workspace)
+        np.log(logs, out=logs)
         # sum logs with a box filter
         sum_logs = cv2.filter2D(
             logs,
             ddepth=-1,
-            kernel=np.ones((size, size), dtype=np.float32),
+            kernel=_ones(size),
+            dst=scratch(workspace, "jeff_sum", image.shape, np.float32),
             borderType=cv2.BORDER_REPLICATE
         )
 
         # exponentiate average log
-        g = np.exp(sum_logs / (size*size))
+        g = np.divide(sum_logs, size*size, out=sum_logs)
+        np.exp(g, out=g)
         
         # clip & cast back
         if np.issubdtype(image.dtype, np.integer):
-            g = np.clip(g, 0, 255)
-            return g.astype(image.dtype)
-        return g
+            np.clip(g, 0, 255, out=g)
+            return _result(g, image.dtype, out)
+        return _result(g, g.dtype, out)
 
-    def harmonic(image: np.ndarray, size: int, eps: float = 1e-6):
+    def harmonic(image: np.ndarray, size: int, eps: float = 1e-6, out=None, workspace=None):
 
         if size < 1 or size % 2 == 0:
             raise ValueError("Kernel size must be a positive odd integer")
         
-        img_f = image.astype(np.float32) + eps
-        reciprocals = 1.0 / img_f
+        img_f = _float_image(image, eps, workspace)
+        reciprocals = np.divide(1.0, img_f, out=img_f)
         # sum reciprocals in box
         sum_rec = cv2.filter2D(
             reciprocals,
             ddepth=-1,
-            kernel=np.ones((size, size), dtype=np.float32),
+            kernel=_ones(size),
+            dst=scratch(workspace, "jeff_sum", image.shape, np.float32),
             borderType=cv2.BORDER_REPLICATE
         )
         # harmonic mean
-        h = (size * size) / sum_rec
-        return np.clip(h, 0, 255).astype(image.dtype)
+        h = np.divide(size * size, sum_rec, out=sum_rec)
+        np.clip(h, 0, 255, out=h)
+        return _result(h, image.dtype, out)
 
     def contraharmonic(image: np.ndarray,
         size: int,
         Q: float,
-        eps: float = 1e-6) -> np.ndarray:
+        eps: float = 1e-6,
+        out=None,
+        workspace=None) -> np.ndarray:
 
         if size < 1 or size % 2 == 0:
             raise ValueError("Kernel size must be a positive odd integer")
-        img_f = image.astype(np.float32) + eps
-        kernel = np.ones((size, size), dtype=np.float32)
+        img_f = _float_image(image, eps, workspace)
+        kernel = _ones(size)
+        powers = scratch(workspace, "jeff_powers", image.shape, np.float32)
 
         # numerator: sum of I^(Q+1)
-        num = cv2.filter2D(img_f**(Q + 1), ddepth=-1, kernel=kernel)
+        num = cv2.filter2D(np.power(img_f, Q + 1, out=powers), ddepth=-1, kernel=kernel,
+                           dst=scratch(workspace, "jeff_sum", image.shape, np.float32))
 
         # denominator: sum of I^Q
-        den = cv2.filter2D(img_f**Q, ddepth=-1, kernel=kernel)
+        den = cv2.filter2D(np.power(img_f, Q, out=powers), ddepth=-1, kernel=kernel,
+                           dst=scratch(workspace, "jeff_den", image.shape, np.float32))
 
         # contraharmonic ratio
-        ch_full = num / den
+        ch_full = np.divide(num, den, out=num)
 
         # crop off borders
         pad = size // 2
         ch_valid = ch_full[pad:-pad, pad:-pad]
 
-        return np.clip(ch_valid, 0, 255).astype(image.dtype)
+        np.clip(ch_valid, 0, 255, out=ch_valid)
+        return _result(ch_valid, image.dtype, out)
 
-    def median(image: np.ndarray, size: int):
+    def median(image: np.ndarray, size: int, out=None, workspace=None):
 
         if size < 1 or size % 2 == 0:
             raise ValueError("Kernel size must be a positive odd integer")
         # OpenCV’s medianBlur expects a single-channel uint8 image
-        return cv2.medianBlur(image, size)
+        return cv2.medianBlur(image, size, dst=out)
 
-    def max(image: np.ndarray, size: int) -> np.ndarray:
+    def max(image: np.ndarray, size: int, out=None, workspace=None) -> np.ndarray:
         if size < 1 or size % 2 == 0:
             raise ValueError("Kernel size must be a positive odd integer")
-        kernel = np.ones((size, size), dtype=np.uint8)
-        return cv2.dilate(image, kernel)    
+        # same result as cv2.dilate with a size x size square
+        return minmax.maximum_filter(image, size, mode="nearest", out=out, workspace=workspace)
 
-    def min(image: np.ndarray, size: int) -> np.ndarray:
+    def min(image: np.ndarray, size: int, out=None, workspace=None) -> np.ndarray:
         if size < 1 or size % 2 == 0:
             raise ValueError("Kernel size must be a positive odd integer")
-        kernel = np.ones((size, size), dtype=np.uint8)
-        return cv2.erode(image, kernel)
+        # same result as cv2.erode with a size x size square
+        return minmax.minimum_filter(image, size, mode="nearest", out=out, workspace=workspace)
 
-    def midpoint(image: np.ndarray, size: int) -> np.ndarray:
-        # compute max and min
-        max_img = Filter.max(image, size)
-        min_img = Filter.min(image, size)
-        # average them
-        mid = (max_img.astype(np.float32) + min_img.astype(np.float32)) / 2
-        return np.clip(mid, 0, 255).astype(image.dtype)
+    def midpoint(image: np.ndarray, size: int, out=None, workspace=None) -> np.ndarray:
+        # max and min from one fused pass, then average them
+        mid = minmax.midpoint_filter(image, size, mode="nearest", workspace=workspace,
+                                     out=scratch(workspace, "jeff_midpoint", image.shape))
+        np.clip(mid, 0, 255, out=mid)
+        return _result(mid, image.dtype, out)
 
 def plot_filters(original: np.ndarray,
                  filtered: dict[int, np.ndarray],
@@ -129,10 +172,7 @@ if __name__ == "__main__":
     image_name = "stripes"
 
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            # data = np.fromfile(f, dtype=np.uint8)
-            data = np.frombuffer(f.read(), dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw(image_name)
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
@@ -1,96 +1,50 @@
+import sys
+from pathlib import Path
 import numpy as np
-import cv2
 import matplotlib.pyplot as plt
-from scipy.fft import fft2, ifft2, fftshift
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc import deconvolve, kernels
+from imgproc.convolve import correlate
+from imgproc.raw_io import load_raw
 
 L = 256
-ROWS = 480
-COLUMNS = 640
 
 # Parameters
 size = 31
-half_size = size // 2
 sigma = 7.0  # standard deviation, estimated from g(7,0) = A * exp(-49 / (2*sigma^2)) = A * exp(-0.5)
-A = 1/291.66706483023165  # Initial guess
+K_sweep = np.logspace(-8, 0, 33)  # candidates for K_regularization = "gcv" / "lcurve"
 
 # Generate 31x31 Gaussian filter g(i,j)
 def gaussian_filter(size, sigma):
-    g = np.zeros((size, size), dtype=np.float64)
-    for i in range(-half_size, half_size + 1):
-        for j in range(-half_size, half_size + 1):
-            g[i + half_size, j + half_size] = A * np.exp(-(i**2 + j**2) / (2 * sigma**2))
-    print(f"{np.sum(g)=}")
-    g /= np.sum(g)  # Normalize so the sum = 1
-    return g
+    # Vectorized closed form, cached per (size, sigma); normalized to sum 1,
+    # which also cancels the amplitude A
+    return kernels.gaussian(size, sigma)
 
 # TODO: Inverse filtering using DFT
-def inverse_filter(degraded, kernel, K_regularization=1e-3): # Added K_regularization parameter
-
-    # Ensure inputs are float for FFT
-    degraded = degraded.astype(np.float64)
-    kernel = kernel.astype(np.float64)
-
-    # 1. Prepare the kernel's DFT (Optical Transfer Function - OTF)
-    #    The kernel (PSF) needs to be padded to the image size.
-    #    Its conceptual origin (center of the PSF) must be placed at the (0,0) index
-    #    of the padded array for the DFT to represent the correct transfer function H(u,v).
-    
-    img_rows, img_cols = degraded.shape
-    k_rows, k_cols = kernel.shape
-    
-    # The input `kernel` has its conceptual (0,0) at its center (k_rows//2, k_cols//2)
-    k_center_r, k_center_c = k_rows // 2, k_cols // 2
-
-    psf_padded = np.zeros((img_rows, img_cols), dtype=np.float64)
-
-    # Place the kernel elements into the padded PSF array such that the
-    # kernel's center aligns with the (0,0) index of psf_padded (with wrap-around).
-    for r_idx in range(k_rows):
-        for c_idx in range(k_cols):
-            # map kernel index (r_idx, c_idx) to coordinates relative to kernel's center (i, j)
-            i = r_idx - k_center_r
-            j = c_idx - k_center_c
-            
-            # map (i,j) to indices in the padded PSF array (with wrap-around for negative indices)
-            # (i % img_rows) ensures that negative i wraps around to img_rows + i
-            dest_r = (i + img_rows) % img_rows 
-            dest_c = (j + img_cols) % img_cols
-            psf_padded[dest_r, dest_c] = kernel[r_idx, c_idx]
-            
-    H = fft2(psf_padded) # Optical Transfer Function (OTF)
-
-    # 2. Get DFT of the degraded image
-    Degraded_DFT = fft2(degraded)
-
-    # 3. Perform inverse filtering in frequency domain
-    #    A common regularized form for inverse filtering is:
-    #    Restored_DFT = (conj(H) / (|H|^2 + K)) * Degraded_DFT
-    #    where K is a small regularization constant.
-    
-    H_conj = np.conj(H)
-    H_abs_sq = np.abs(H)**2
-    
-    Restored_DFT = (H_conj / (H_abs_sq + K_regularization)) * Degraded_DFT
-
-    # 4. Get restored image by inverse DFT
-    #    The result of ifft2 can be complex due to numerical precision.
-    #    Taking the real part is appropriate if the original image is real.
-    restored_spatial_complex = ifft2(Restored_DFT)
-    restored_image = np.real(restored_spatial_complex)
-
-    # The restored image is float and its values can be outside [0, 255].
-    # Clipping or further normalization might be needed for specific applications or display,
-    # but the function returns the raw float result.
-    return restored_image
+def inverse_filter(degraded, kernel, K_regularization=1e-3, workers=None, return_K=False): # Added K_regularization parameter
+
+    # Restored_DFT = (conj(H) / (|H|^2 + K)) * Degraded_DFT, where H is the
+    # OTF: the kernel zero-padded to the image size with its center at (0,0)
+    # (wrap-around). H and the whole conj(H) / (|H|^2 + K) factor are cached
+    # per (kernel, image shape, K), so each call is one rfft2 and one irfft2
+    # (run on `workers` threads).
+    # The result is the raw float image; values can be outside [0, 255].
+    # K_regularization = "gcv" or "lcurve" picks K from a sweep instead;
+    # return_K=True also returns the K that was used.
+    if isinstance(K_regularization, str):
+        sweep = deconvolve.k_sweep(degraded, kernel, K_sweep, criterion=K_regularization, workers=workers)
+        restored, K = sweep["restored"], sweep["K"]
+    else:
+        restored, K = deconvolve.inverse_filter(degraded, kernel, K_regularization, workers=workers), K_regularization
+    return (restored, K) if return_K else restored
 
 if __name__ == "__main__":
 
     image_name = "triangle" 
 
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            data = np.fromfile(f, dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw(image_name)
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
@@ -101,11 +55,15 @@ if __name__ == "__main__":
     # Create the Gaussian kernel
     g = gaussian_filter(size, sigma)
 
-    # Degrade image by convolution
-    degraded = cv2.filter2D(original_image, -1, g)
+    # Degrade image by convolution (rank-1 Gaussian runs as two 1-D passes;
+    # 'mirror' is the BORDER_REFLECT_101 default of cv2.filter2D)
+    degraded = np.clip(np.round(correlate(original_image, g, mode="mirror")), 0, 255).astype(np.uint8)
 
-    # Apply inverse filtering
-    restored = inverse_filter(degraded, g)
+    # Apply inverse filtering (set K_regularization to "gcv" to choose K automatically)
+    K_regularization = 1e-3
+    restored, K = inverse_filter(degraded, g, K_regularization, return_K=True)
+    if isinstance(K_regularization, str):
+        print(f"{K_regularization}: K = {K:.3g}")
 
     # Show images
     plt.figure(figsize=(12, 8))
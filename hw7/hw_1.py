@@ -1,35 +1,31 @@
-import cv2
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from imgproc import kernels
+from imgproc.convolve import correlate_channels
+from imgproc.raw_io import load_raw
+from imgproc.workspace import to_dtype
+
 L = 256
-ROWS = 480
-COLUMNS = 640
 
 # Parameters
 size = 31
-half_size = size // 2
 sigma = 7.0
-A = 1 / 291.66706483023165
 
 # Gaussian filter from HW6
 def gaussian_filter(size, sigma):
-    g = np.zeros((size, size), dtype=np.float64)
-    for i in range(-half_size, half_size + 1):
-        for j in range(-half_size, half_size + 1):
-            g[i + half_size, j + half_size] = A * np.exp(-(i**2 + j**2) / (2 * sigma**2))
-    print(f"{np.sum(g)=}")
-    g /= np.sum(g)
-    return g
+    # Same cached closed-form kernel as hw6
+    return kernels.gaussian(size, sigma)
 
 if __name__ == "__main__":
 
     image_name = "triangle"
 
     try:
-        with open(f"{image_name}.raw", "rb") as f:
-            data = np.fromfile(f, dtype=np.uint8)
-            original_image = data.reshape((ROWS, COLUMNS))
+        original_image = load_raw(image_name)
     except FileNotFoundError:
         print(f"Error: '{image_name}.raw' not found.")
         exit()
@@ -37,34 +33,25 @@ if __name__ == "__main__":
         print(f"Error loading '{image_name}.raw': {e}")
         exit()
 
-    # Create RGB channels
-    R = original_image.astype(np.float32)
-    G = 0.5 * original_image
-    B = 0.2 * original_image
-
-    # Clip and convert to uint8
-    R = np.clip(np.round(R), 0, 255).astype(np.uint8)
-    G = np.clip(np.round(G), 0, 255).astype(np.uint8)
-    B = np.clip(np.round(B), 0, 255).astype(np.uint8)
+    # Create RGB channels straight into the color image: R is the image
+    # itself, G and B are scaled in a float scratch buffer and rounded,
+    # clipped and cast into their channel in place
+    input_color_image = np.empty(original_image.shape + (3,), dtype=np.uint8)
+    scratch = np.empty(original_image.shape, dtype=np.float64)
 
-    # Stack to get input color image
-    input_color_image = np.stack((R, G, B), axis=-1)
+    input_color_image[..., 0] = original_image
+    to_dtype(np.multiply(original_image, 0.5, out=scratch), np.uint8, out=input_color_image[..., 1])
+    to_dtype(np.multiply(original_image, 0.2, out=scratch), np.uint8, out=input_color_image[..., 2])
 
     # Create Gaussian filter
     g_filter = gaussian_filter(size, sigma)
 
-    # Filter each channel
-    R_filtered = cv2.filter2D(R.astype(np.float32), -1, g_filter)
-    G_filtered = cv2.filter2D(G.astype(np.float32), -1, g_filter)
-    B_filtered = cv2.filter2D(B.astype(np.float32), -1, g_filter)
-
-    # Clip and convert to uint8
-    R_filtered = np.clip(np.round(R_filtered), 0, 255).astype(np.uint8)
-    G_filtered = np.clip(np.round(G_filtered), 0, 255).astype(np.uint8)
-    B_filtered = np.clip(np.round(B_filtered), 0, 255).astype(np.uint8)
-
-    # Stack to get filtered color image
-    filtered_color_image = np.stack((R_filtered, G_filtered, B_filtered), axis=-1)
+    # Filter the interleaved color image in one call, rounded and cast
+    # straight into the uint8 result. G and B are only R scaled up to the
+    # rounding to uint8, so every channel is filtered to keep the result
+    # identical to filtering them one by one
+    filtered_color_image = np.empty_like(input_color_image)
+    correlate_channels(input_color_image, g_filter, mode="mirror", out=filtered_color_image)
 
     # Show images
     plt.figure(figsize=(12, 6))
@@ -0,0 +1 @@
+"""Shared image processing helpers used by the homework scripts."""
@@ -0,0 +1,154 @@
+"""Run one homework operation over many raw images in parallel.
+
+    python -m imgproc.batch hw3 average --size 11 --workers 8 --out results
+    python -m imgproc.batch "frames/*.raw" gamma --gamma 0.4 --unordered
+"""
+import argparse
+import glob
+import os
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+
+from imgproc.clahe import adaptive_equalization
+from imgproc.homework import load_homework
+from imgproc.raw_io import load_raw, save_raw
+
+def gamma(image, args):
+    hw = load_homework("hw2/hw_1.py")
+    return hw.apply_lookup_table(image, hw.generate_lookup_table(args.gamma))
+
+def equalize(image, args):
+    equalized_image, mapping = load_homework("hw2/hw_2.py").histogram_equalization(image)
+    return equalized_image
+
+def clahe(image, args):
+    return adaptive_equalization(image, tiles=args.tiles, clip_limit=args.clip_limit)
+
+def average(image, args):
+    return load_homework("hw3/hw_a.py").apply_averaging_filter(image, args.size)
+
+def median(image, args):
+    return load_homework("hw3/hw_b.py").apply_median_filter(image, args.size)
+
+def laplacian(image, args):
+    hw = load_homework("hw4/hw_a.py")
+    return hw.rescale_to_uint8(hw.laplacian_response(image))
+
+def sharpen(image, args):
+    return load_homework("hw4/hw_a.py").apply_sharpening_filter(image)
+
+def dft(image, args):
+    return load_homework("hw4/hw_b.py").compute_dft_magnitude(image)
+
+def inverse_filter(image, args):
+    hw = load_homework("hw6/hw_1.py")
+    restored = hw.inverse_filter(image, hw.gaussian_filter(hw.size, hw.sigma), args.K)
+    return np.clip(np.round(restored), 0, 255).astype(np.uint8)
+
+def _jeff(method):
+    def run(image, args):
+        return getattr(load_homework("hw5/jeff.py").Filter, method)(image, args.size)
+    return run
+
+OPERATIONS = {
+    "gamma": gamma,
+    "equalize": equalize,
+    "clahe": clahe,
+    "average": average,
+    "median": median,
+    "laplacian": laplacian,
+    "sharpen": sharpen,
+    "dft": dft,
+    "inverse_filter": inverse_filter,
+    "mean": _jeff("mean"),
+    "geo_mean": _jeff("geo_mean"),
+    "harmonic": _jeff("harmonic"),
+    "max": _jeff("max"),
+    "min": _jeff("min"),
+    "midpoint": _jeff("midpoint"),
+}
+
+def find_raw_files(source):
+    """A directory (all *.raw inside) or a glob pattern"""
+    if os.path.isdir(source):
+        return sorted(str(p) for p in Path(source).glob("*.raw"))
+    return sorted(glob.glob(source))
+
+def process_file(task):
+    """Worker: load one raw file, apply the operation, optionally save the result.
+
+    Returns (path, shape, seconds, error); a file that fails has shape None
+    and the error message, so one bad frame does not stop the batch.
+    """
+    path, args = task
+    start = time.perf_counter()
+
+    try:
+        image = load_raw(path, shape=args.shape, dtype=args.dtype)
+        result = OPERATIONS[args.operation](image, args)
+        if args.out is not None:
+            save_raw(Path(args.out) / Path(path).name, result)
+    except Exception as e:
+        return path, None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+    return path, result.shape, time.perf_counter() - start, None
+
+def run_batch(files, args):
+    """Yield (path, shape, seconds, error) per image, in input order unless args.unordered"""
+    tasks = [(path, args) for path in files]
+    with Pool(processes=args.workers) as pool:
+        imap = pool.imap_unordered if args.unordered else pool.imap
+        yield from imap(process_file, tasks, chunksize=args.chunksize)
+
+def parse_shape(text):
+    rows, cols = text.lower().split("x")
+    return int(rows), int(cols)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a homework operation to a directory or glob of .raw images")
+    parser.add_argument("source", help="directory of .raw files or a glob pattern")
+    parser.add_argument("operation", choices=sorted(OPERATIONS))
+    parser.add_argument("--out", default=None, help="directory for the output .raw files (default: discard)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=4, help="files handed to a worker at once")
+    parser.add_argument("--unordered", action="store_true", help="report results as they finish")
+    parser.add_argument("--shape", type=parse_shape, default=None, help="ROWSxCOLUMNS when there is no descriptor")
+    parser.add_argument("--dtype", default=None, help="pixel type for files that are neither described nor registered (default: uint8)")
+    parser.add_argument("--size", type=int, default=11, help="window size for neighbourhood filters")
+    parser.add_argument("--gamma", type=float, default=0.4)
+    parser.add_argument("--tiles", type=parse_shape, default=(8, 8), help="CLAHE tile grid, ROWSxCOLUMNS")
+    parser.add_argument("--clip-limit", type=float, default=2.0, help="CLAHE clip limit (x mean bin count)")
+    parser.add_argument("--K", type=float, default=1e-3, help="regularization for inverse_filter")
+    parser.add_argument("--quiet", action="store_true")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = find_raw_files(args.source)
+    if not files:
+        print(f"Error: no .raw files found in '{args.source}'")
+        return 1
+    if args.out is not None:
+        os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    failed = 0
+    for path, shape, seconds, error in run_batch(files, args):
+        if error is not None:
+            failed += 1
+            print(f"{path}: failed: {error}")
+        elif not args.quiet:
+            print(f"{path}: {shape[0]}x{shape[1]} in {seconds * 1000:.1f} ms")
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(files)} images in {elapsed:.2f} s ({len(files) / elapsed:.1f} images/sec, {args.workers} workers)")
+    if failed:
+        print(f"{failed} of {len(files)} images failed")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+import numpy as np
+
+from imgproc.border import check_size, pad
+from imgproc.workspace import scratch
+
+class IntegralImage:
+    """Summed-area table of an image, padded once for windows up to max_size.
+
+    Any box sum is then four lookups per pixel, whatever the window size,
+    and the same table serves every size <= max_size (larger sizes re-pad).
+    Integer images are summed exactly in int64, float images in float64.
+    update() refills the same buffers from a new frame of the same shape.
+    mode="constant" pads with cval. Tables sharing a workspace need
+    different names.
+    """
+
+    def __init__(self, image, mode="nearest", max_size=31, workspace=None, cval=0.0, name="integral"):
+        self.image = np.asarray(image)
+        self.mode = mode
+        self.cval = cval
+        self.workspace = workspace
+        self.name = name
+        self._build(max_size)
+        self._squares = None
+
+    def _build(self, max_size):
+        check_size(max_size)
+        self.radius = max_size // 2
+        acc = np.int64 if np.issubdtype(self.image.dtype, np.integer) else np.float64
+        r = self.radius
+        shape = (self.image.shape[0] + 2 * r, self.image.shape[1] + 2 * r)
+        padded = pad(self.image, r, mode=self.mode, cval=self.cval,
+                     out=scratch(self.workspace, f"{self.name}_pad", shape, self.image.dtype))
+        table = scratch(self.workspace, self.name, (shape[0] + 1, shape[1] + 1), acc)
+        table[0] = 0
+        table[:, 0] = 0
+        # Cast into the table first: cumsum with a dtype change would
+        # allocate a converted copy of the whole image
+        table[1:, 1:] = padded
+        np.cumsum(table[1:, 1:], axis=0, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        self.table = table
+
+    def update(self, image):
+        """Rebuild the table in place for a new image of the same shape and dtype"""
+        image = np.asarray(image)
+        if image.shape != self.image.shape or image.dtype != self.image.dtype:
+            raise ValueError("update() needs an image of the same shape and dtype")
+        self.image = image
+        self._build(2 * self.radius + 1)
+        if self._squares is not None:
+            self._squares.update(self._square(image, self._squares.image))
+        return self
+
+    def box_sum(self, size, out=None):
+        """Sum over the size x size window centered on every pixel"""
+        check_size(size)
+        if size // 2 > self.radius:
+            self._build(size)
+        rows, cols = self.image.shape
+        r = size // 2
+        lo = self.radius - r
+        hi = self.radius + r + 1
+        S = self.table
+        if out is None:
+            return (S[hi:hi + rows, hi:hi + cols] - S[lo:lo + rows, hi:hi + cols]
+                    - S[hi:hi + rows, lo:lo + cols] + S[lo:lo + rows, lo:lo + cols])
+        np.subtract(S[hi:hi + rows, hi:hi + cols], S[lo:lo + rows, hi:hi + cols], out=out)
+        np.subtract(out, S[hi:hi + rows, lo:lo + cols], out=out)
+        np.add(out, S[lo:lo + rows, lo:lo + cols], out=out)
+        return out
+
+    def box_mean(self, size, out=None):
+        if out is None:
+            return self.box_sum(size) / (size * size)
+        return np.divide(self.box_sum(size, out=out), size * size, out=out)
+
+    @staticmethod
+    def _square(image, out=None):
+        acc = np.int64 if np.issubdtype(image.dtype, np.integer) else np.float64
+        if out is None:
+            return image.astype(acc) ** 2
+        np.square(image, out=out, dtype=acc)
+        return out
+
+    def box_sum_of_squares(self, size, out=None):
+        """Window sums of image**2, from a second table built on first use"""
+        if self._squares is None:
+            acc = np.int64 if np.issubdtype(self.image.dtype, np.integer) else np.float64
+            squares = self._square(self.image, scratch(self.workspace, f"{self.name}_squares", self.image.shape, acc))
+            self._squares = IntegralImage(squares, self.mode, 2 * self.radius + 1, self.workspace,
+                                          self.cval ** 2, f"{self.name}_of_squares")
+        return self._squares.box_sum(size, out=out)
+
+def box_sum(image, size, mode="nearest", out=None, workspace=None):
+    return IntegralImage(image, mode, size, workspace).box_sum(size, out=out)
+
+def box_mean(image, size, mode="nearest", out=None, workspace=None):
+    return IntegralImage(image, mode, size, workspace).box_mean(size, out=out)
+
+def box_sum_of_squares(image, size, mode="nearest", out=None, workspace=None):
+    return IntegralImage(image, mode, size, workspace).box_sum_of_squares(size, out=out)
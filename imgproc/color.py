@@ -0,0 +1,178 @@
+"""Color model conversions between RGB and HSI, HSV, YCbCr and CMY.
+
+RGB comes in as H x W x 3, integer images scaled by their dtype's
+maximum, float images taken as 0-1. Every other model is returned as
+float64 with all components in 0-1 (hue as a fraction of a turn), and the
+inverse conversions return 0-1 RGB.
+
+YCbCr (ITU-R BT.601, full range) and CMY are affine, one matmul over the
+channel axis with the integer scale folded into the matrix. HSI and HSV
+hue is piecewise; it is computed with np.where / take_along_axis instead
+of per-pixel branches. convert_raw streams a memory-mapped image strip by
+strip, so large scans are converted in bounded memory.
+"""
+import os
+
+import numpy as np
+
+from imgproc.raw_io import create_raw, load_raw
+from imgproc.stream import STRIP_ROWS
+from imgproc.workspace import to_dtype
+
+SPACES = ("rgb", "hsi", "hsv", "ycbcr", "cmy")
+
+# Rows give Y, Cb, Cr from R, G, B; Cb and Cr are offset by 0.5
+YCBCR_MATRIX = np.array([[0.299, 0.587, 0.114],
+                         [-0.168736, -0.331264, 0.5],
+                         [0.5, -0.418688, -0.081312]])
+YCBCR_OFFSET = np.array([0.0, 0.5, 0.5])
+
+YCBCR_INVERSE = np.linalg.inv(YCBCR_MATRIX)
+
+YCBCR_MATRIX.setflags(write=False)
+YCBCR_OFFSET.setflags(write=False)
+YCBCR_INVERSE.setflags(write=False)
+
+def _check_color(image):
+    image = np.asarray(image)
+    if image.ndim < 1 or image.shape[-1] != 3:
+        raise ValueError(f"Expected 3 color channels in the last axis, got shape {image.shape}")
+    return image
+
+def _scale(image):
+    """Factor that maps the image's values to 0-1"""
+    if np.issubdtype(image.dtype, np.integer):
+        return 1.0 / np.iinfo(image.dtype).max
+    return 1.0
+
+def _unit(image):
+    image = _check_color(image)
+    scale = _scale(image)
+    return image * scale if scale != 1.0 else image.astype(np.float64)
+
+def _affine(image, matrix, offset):
+    """image @ matrix.T + offset over the last axis, the input scale folded into the matrix"""
+    image = _check_color(image)
+    out = np.matmul(image, (matrix * _scale(image)).T)
+    out += offset
+    return out
+
+def rgb_to_ycbcr(rgb):
+    return _affine(rgb, YCBCR_MATRIX, YCBCR_OFFSET)
+
+def ycbcr_to_rgb(ycbcr):
+    return _affine(ycbcr, YCBCR_INVERSE, -YCBCR_INVERSE @ YCBCR_OFFSET)
+
+def rgb_to_cmy(rgb):
+    return _affine(rgb, -np.eye(3), np.ones(3))
+
+def cmy_to_rgb(cmy):
+    return _affine(cmy, -np.eye(3), np.ones(3))
+
+def _hue(rgb, delta):
+    """HSV hue in turns: the sector of the largest channel plus the offset inside it"""
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    channel = np.argmax(rgb, axis=-1)
+    # Largest channel R: (G - B), G: 2 + (B - R), B: 4 + (R - G), in sixths of a turn
+    differences = np.stack([g - b, b - r, r - g], axis=-1)
+    difference = np.take_along_axis(differences, channel[..., None], axis=-1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hue = (2.0 * channel + difference / delta) / 6.0
+    hue = np.where(delta > 0, hue, 0.0)
+    return hue % 1.0
+
+def rgb_to_hsv(rgb):
+    rgb = _unit(rgb)
+    high = rgb.max(axis=-1)
+    delta = high - rgb.min(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        saturation = np.where(high > 0, delta / high, 0.0)
+    return np.stack([_hue(rgb, delta), saturation, high], axis=-1)
+
+def hsv_to_rgb(hsv):
+    """Each channel is V - V S clip(min(k, 4 - k), 0, 1) with k = (n + 6 H) mod 6, n = 5, 3, 1"""
+    hsv = _unit(hsv)
+    h, s, v = hsv[..., 0:1], hsv[..., 1:2], hsv[..., 2:3]
+    k = (np.array([5.0, 3.0, 1.0]) + 6.0 * h) % 6.0
+    return v - v * s * np.clip(np.minimum(k, 4.0 - k), 0.0, 1.0)
+
+def rgb_to_hsi(rgb):
+    """Gonzalez & Woods HSI: hue from the angle to the red axis, S = 1 - min / I"""
+    rgb = _unit(rgb)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    intensity = rgb.mean(axis=-1)
+    numerator = 0.5 * ((r - g) + (r - b))
+    denominator = np.sqrt((r - g) ** 2 + (r - b) * (g - b))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        theta = np.arccos(np.clip(numerator / denominator, -1.0, 1.0)) / (2.0 * np.pi)
+        saturation = np.where(intensity > 0, 1.0 - rgb.min(axis=-1) / intensity, 0.0)
+    hue = np.where(b <= g, theta, 1.0 - theta)
+    hue = np.where(denominator > 0, hue, 0.0)
+    return np.stack([hue, saturation, intensity], axis=-1)
+
+def hsi_to_rgb(hsi):
+    """Inverse of rgb_to_hsi; the three 120 degree sectors differ only by a rotation of the channels"""
+    hsi = _unit(hsi)
+    h, s, i = hsi[..., 0], hsi[..., 1], hsi[..., 2]
+    turns = (h % 1.0) * 3.0
+    sector = np.minimum(np.floor(turns).astype(np.intp), 2)
+    angle = (turns - sector) * (2.0 * np.pi / 3.0)
+    low = i * (1.0 - s)
+    lead = i * (1.0 + s * np.cos(angle) / np.cos(np.pi / 3.0 - angle))
+    # Sector RG gives (R, G, B) = (lead, rest, low); GB and BR rotate that by one and two channels
+    values = np.stack([lead, 3.0 * i - lead - low, low], axis=-1)
+    index = (np.arange(3) - sector[..., None]) % 3
+    return np.take_along_axis(values, index, axis=-1)
+
+# (from, to) -> conversion
+CONVERSIONS = {
+    ("rgb", "hsi"): rgb_to_hsi,
+    ("hsi", "rgb"): hsi_to_rgb,
+    ("rgb", "hsv"): rgb_to_hsv,
+    ("hsv", "rgb"): hsv_to_rgb,
+    ("rgb", "ycbcr"): rgb_to_ycbcr,
+    ("ycbcr", "rgb"): ycbcr_to_rgb,
+    ("rgb", "cmy"): rgb_to_cmy,
+    ("cmy", "rgb"): cmy_to_rgb,
+}
+
+def convert(image, source, target):
+    """Convert between any two of SPACES (through RGB when neither is RGB)"""
+    for space in (source, target):
+        if space not in SPACES:
+            raise ValueError(f"Unknown color space '{space}', expected one of {SPACES}")
+    if source == target:
+        return _unit(image)
+    if source != "rgb" and target != "rgb":
+        return CONVERSIONS["rgb", target](CONVERSIONS[source, "rgb"](image))
+    return CONVERSIONS[source, target](image)
+
+def convert_strips(image, source, target, strip_rows=STRIP_ROWS, channels=None):
+    """Yield (start, stop, converted) for horizontal strips; only `channels` are kept when given"""
+    for start in range(0, image.shape[0], strip_rows):
+        stop = min(start + strip_rows, image.shape[0])
+        converted = convert(np.asarray(image[start:stop]), source, target)
+        yield start, stop, converted if channels is None else converted[..., channels]
+
+def convert_raw(src, dst, source, target, dtype=np.float32, channels=None, strip_rows=STRIP_ROWS):
+    """Convert a memory-mapped color image strip by strip into a new raw file.
+
+    Only one strip of `strip_rows` rows is held in memory at a time.
+    A float dtype stores the 0-1 components, an integer dtype stores them
+    scaled to its full range (rounded and clipped). `channels` picks the
+    components to write, e.g. channels=2 gives the HSI intensity plane alone.
+    """
+    image = load_raw(src) if isinstance(src, (str, os.PathLike)) else src
+    _check_color(image)
+    integer = np.issubdtype(dtype, np.integer)
+    out = None
+    for start, stop, converted in convert_strips(image, source, target, strip_rows, channels):
+        if out is None:
+            out = create_raw(dst, (image.shape[0],) + converted.shape[1:], dtype)
+        if integer:
+            converted *= np.iinfo(dtype).max
+            to_dtype(converted, dtype, out=out[start:stop])
+        else:
+            out[start:stop] = converted
+        out.flush()
+    return out
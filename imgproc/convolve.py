@@ -0,0 +1,322 @@
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from scipy import fft, ndimage
+
+from imgproc.border import PAD_MODES, pad
+from imgproc.workspace import scratch, to_dtype
+
+# Singular values below TOLERANCE * largest one are dropped
+TOLERANCE = 1e-7
+
+# Cost model, in units of one spatial multiply-add: an FFT-based convolution
+# of P padded pixels costs about FFT_COST * P * log2(P) (measured with scipy
+# on 480x640 frames, kernel spectrum cached, padding included)
+FFT_COST = 3.0
+
+# Images whose padded size exceeds FFT_BLOCK in either direction are
+# convolved in FFT_BLOCK x FFT_BLOCK tiles (overlap-add)
+FFT_BLOCK = 1024
+
+METHODS = ("auto", "direct", "separable", "fft")
+
+def kernel_key(kernel):
+    """Hashable identity of a kernel's values, for caches"""
+    kernel = np.ascontiguousarray(kernel, dtype=np.float64)
+    return kernel.shape, kernel.tobytes()
+
+@lru_cache(maxsize=128)
+def _factors(key, tol):
+    shape, data = key
+    kernel = np.frombuffer(data, dtype=np.float64).reshape(shape)
+    u, s, vt = np.linalg.svd(kernel)
+    rank = int(np.sum(s > tol * s[0])) if s[0] > 0 else 0
+    factors = []
+    for i in range(rank):
+        scale = np.sqrt(s[i])
+        factors.append((u[:, i] * scale, vt[i] * scale))
+    return tuple(factors)
+
+# Exact factors of kernels built from closed forms (imgproc.kernels), used
+# instead of the SVD. Least recently used entries are dropped past
+# KNOWN_FACTORS_SIZE, as many as the kernel caches hold
+KNOWN_FACTORS_SIZE = 128
+_KNOWN_FACTORS = OrderedDict()
+
+def register_factors(kernel, factors):
+    """Record exact (column, row) factor pairs for a kernel's values"""
+    key = kernel_key(kernel)
+    _KNOWN_FACTORS[key] = tuple(factors)
+    _KNOWN_FACTORS.move_to_end(key)
+    while len(_KNOWN_FACTORS) > KNOWN_FACTORS_SIZE:
+        _KNOWN_FACTORS.popitem(last=False)
+
+def separable_factors(kernel, tol=TOLERANCE):
+    """(column, row) 1-D factor pairs with kernel ~= sum(outer(column, row)), cached per kernel.
+
+    Registered factors are exact, so their dropped singular values are
+    zero and they hold for any tol > 0; tol <= 0 always goes through the SVD.
+    """
+    key = kernel_key(kernel)
+    if tol > 0 and key in _KNOWN_FACTORS:
+        _KNOWN_FACTORS.move_to_end(key)
+        return _KNOWN_FACTORS[key]
+    return _factors(key, tol)
+
+def _check_mode(mode):
+    if mode not in PAD_MODES:
+        raise ValueError(f"Unknown border mode '{mode}', expected one of {sorted(PAD_MODES)}")
+
+def _output(image, out):
+    # ndimage reads any input dtype and accumulates in double, so integer
+    # images need no float copy; it only has to write into a float64 array
+    return np.empty(np.shape(image), dtype=np.float64) if out is None else out
+
+def correlate_direct(image, kernel, mode="nearest", out=None):
+    """Full 2-D correlation (kh * kw multiply-adds per pixel)"""
+    _check_mode(mode)
+    out = _output(image, out)
+    ndimage.correlate(np.asarray(image), np.asarray(kernel, dtype=np.float64), output=out, mode=mode)
+    return out
+
+def correlate_separable(image, factors, mode="nearest", out=None, workspace=None):
+    """Correlation as a sum of column pass + row pass, one pair per factor"""
+    _check_mode(mode)
+    image = np.asarray(image)
+    out = _output(image, out)
+    tmp = scratch(workspace, "separable_column", image.shape)
+    if len(factors) == 0:
+        out[...] = 0
+    for i, (column, row) in enumerate(factors):
+        ndimage.correlate1d(image, column, axis=0, output=tmp, mode=mode)
+        if i == 0:
+            ndimage.correlate1d(tmp, row, axis=1, output=out, mode=mode)
+        else:
+            term = scratch(workspace, "separable_row", image.shape)
+            ndimage.correlate1d(tmp, row, axis=1, output=term, mode=mode)
+            out += term
+    return out
+
+@lru_cache(maxsize=32)
+def _kernel_spectrum(key, fft_shape):
+    shape, data = key
+    kernel = np.frombuffer(data, dtype=np.float64).reshape(shape)
+    spectrum = fft.rfft2(kernel, s=fft_shape)
+    spectrum.setflags(write=False)
+    return spectrum
+
+def kernel_spectrum(kernel, fft_shape):
+    """rfft2 of the kernel zero-padded to fft_shape, cached per (kernel, padded shape)"""
+    return _kernel_spectrum(kernel_key(kernel), tuple(fft_shape))
+
+def _fft_shape(block_shape, kernel_shape):
+    return tuple(fft.next_fast_len(b + k - 1, real=True) for b, k in zip(block_shape, kernel_shape))
+
+def correlate_fft(image, kernel, mode="nearest", block=FFT_BLOCK, out=None, workspace=None):
+    """2-D correlation through the FFT, with the same border handling as the spatial paths.
+
+    The image is padded with the border mode, linearly convolved with the
+    flipped kernel and cropped back. Large images are cut into block x block
+    tiles whose full convolutions are added into place (overlap-add), so
+    every transform has the same size and reuses one cached kernel spectrum.
+    The padded and accumulation buffers come from the workspace; the
+    spectra themselves are allocated by scipy.fft.
+    """
+    _check_mode(mode)
+    kernel = np.asarray(kernel, dtype=np.float64)
+    kh, kw = kernel.shape
+    rows, cols = image.shape
+    widths = ((kh // 2, kh - 1 - kh // 2), (kw // 2, kw - 1 - kw // 2))
+    padded = scratch(workspace, "fft_pad", (rows + kh - 1, cols + kw - 1))
+    pad(image, widths, mode=mode, out=padded)
+    flipped = kernel[::-1, ::-1]
+
+    block_shape = (min(block, padded.shape[0]), min(block, padded.shape[1]))
+    fft_shape = _fft_shape(block_shape, kernel.shape)
+    spectrum = kernel_spectrum(flipped, fft_shape)
+
+    full = scratch(workspace, "fft_full", (padded.shape[0] + kh - 1, padded.shape[1] + kw - 1))
+    full[...] = 0
+    for r in range(0, padded.shape[0], block_shape[0]):
+        for c in range(0, padded.shape[1], block_shape[1]):
+            tile = padded[r:r + block_shape[0], c:c + block_shape[1]]
+            result = fft.irfft2(fft.rfft2(tile, s=fft_shape) * spectrum, s=fft_shape)
+            h, w = tile.shape[0] + kh - 1, tile.shape[1] + kw - 1
+            full[r:r + h, c:c + w] += result[:h, :w]
+
+    # Correlation output pixel (i, j) is full-convolution pixel (i + kh - 1, j + kw - 1)
+    out = _output(image, out)
+    out[...] = full[kh - 1:kh - 1 + rows, kw - 1:kw - 1 + cols]
+    return out
+
+def spatial_cost(image_shape, kernel_shape, rank=None):
+    """Multiply-adds of the cheaper spatial path (direct, or separable with `rank` terms)"""
+    ops = kernel_shape[0] * kernel_shape[1]
+    if rank is not None:
+        ops = min(ops, rank * (kernel_shape[0] + kernel_shape[1]))
+    return image_shape[0] * image_shape[1] * ops
+
+def fft_cost(image_shape, kernel_shape, block=FFT_BLOCK):
+    """Estimated cost of correlate_fft in multiply-add units"""
+    padded = [n + k - 1 for n, k in zip(image_shape, kernel_shape)]
+    block_shape = [min(block, n) for n in padded]
+    fft_shape = _fft_shape(block_shape, kernel_shape)
+    blocks = np.prod([-(-n // b) for n, b in zip(padded, block_shape)])
+    size = fft_shape[0] * fft_shape[1]
+    return FFT_COST * blocks * size * np.log2(size)
+
+def choose_method(image_shape, kernel, tol=TOLERANCE):
+    """'direct', 'separable' or 'fft', whichever the cost model says is cheapest"""
+    kernel = np.asarray(kernel, dtype=np.float64)
+    rank = len(separable_factors(kernel, tol))
+    direct = spatial_cost(image_shape, kernel.shape)
+    separable = spatial_cost(image_shape, kernel.shape, rank)
+    spectral = fft_cost(image_shape, kernel.shape)
+    if spectral < min(direct, separable):
+        return "fft"
+    return "separable" if separable < direct else "direct"
+
+def correlate(image, kernel, mode="nearest", tol=TOLERANCE, method="auto", out=None, workspace=None):
+    """2-D correlation like cv2.filter2D, dispatched to the cheapest implementation.
+
+    A rank r kernel of size kh x kw costs r * (kh + kw) multiply-adds per
+    pixel as separable passes instead of kh * kw; large dense kernels go
+    through the FFT. All paths use the same border modes, write into `out`
+    (float64) when given and take their scratch buffers from `workspace`.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+    kernel = np.asarray(kernel, dtype=np.float64)
+    if method == "auto":
+        method = choose_method(image.shape, kernel, tol)
+
+    if method == "fft":
+        return correlate_fft(image, kernel, mode, out=out, workspace=workspace)
+    if method == "separable":
+        return correlate_separable(image, separable_factors(kernel, tol), mode, out, workspace)
+    return correlate_direct(image, kernel, mode, out)
+
+def convolve(image, kernel, mode="nearest", tol=TOLERANCE, method="auto", out=None, workspace=None):
+    """2-D convolution (flipped kernel) like ndimage.convolve"""
+    return correlate(image, np.asarray(kernel)[::-1, ::-1], mode, tol, method, out, workspace)
+
+def proportional_channels(image, atol=0.0):
+    """(source, scale) per channel of an H x W x C image: channel c ~= scale * channel source.
+
+    Each channel is compared with the earlier channels that are kept
+    (source == own index, scale 1); the scale is the least squares fit and
+    the channel counts as a multiple when no pixel is off by more than atol.
+    """
+    image = np.asarray(image)
+    channels = []
+    kept = []
+    for c in range(image.shape[2]):
+        values = image[..., c].astype(np.float64)
+        match = (c, 1.0)
+        for source, reference in kept:
+            norm = np.vdot(reference, reference)
+            scale = np.vdot(reference, values) / norm if norm > 0 else 0.0
+            if np.abs(values - scale * reference).max() <= atol:
+                match = (source, float(scale))
+                break
+        if match[0] == c:
+            kept.append((c, values))
+        channels.append(match)
+    return channels
+
+def _correlate_stack(image, kernel, mode, tol, method, out, workspace):
+    """Correlate every channel of an H x W x C stack into float64 `out`"""
+    if method == "auto":
+        method = choose_method(image.shape[:2], kernel, tol)
+    if method == "fft":
+        for c in range(image.shape[2]):
+            plane = scratch(workspace, "channel_plane", image.shape[:2])
+            out[..., c] = correlate_fft(image[..., c], kernel, mode, out=plane, workspace=workspace)
+        return out
+    # The 1-D passes run along axes 0 and 1 of the interleaved array and a
+    # kh x kw x 1 kernel leaves the channel axis alone, so every channel is
+    # filtered by the same ndimage calls
+    if method == "separable":
+        return correlate_separable(image, separable_factors(kernel, tol), mode, out, workspace)
+    return correlate_direct(image, kernel[:, :, None], mode, out)
+
+def correlate_channels(image, kernel, mode="nearest", tol=TOLERANCE, method="auto", out=None,
+                       dtype=np.float64, atol=None, workspace=None):
+    """correlate() for an H x W x C image in its interleaved layout.
+
+    With atol set, channels that are scalar multiples of an earlier one
+    (see proportional_channels) are not filtered again but scaled from its
+    result, which differs from filtering them by at most
+    atol * sum(|kernel|). For an integer dtype (or integer `out`) the
+    result is rounded, clipped and cast straight into the output.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+    _check_mode(mode)
+    image = np.asarray(image)
+    if image.ndim != 3:
+        raise ValueError(f"Expected an H x W x C image, got shape {image.shape}")
+    kernel = np.asarray(kernel, dtype=np.float64)
+    if out is None:
+        out = np.empty(image.shape, dtype=dtype)
+    integer = np.issubdtype(out.dtype, np.integer)
+
+    channels = [(c, 1.0) for c in range(image.shape[2])] if atol is None else proportional_channels(image, atol)
+    kept = [c for c, (source, _) in enumerate(channels) if source == c]
+    if len(kept) == image.shape[2] and not integer:
+        return _correlate_stack(image, kernel, mode, tol, method, out, workspace)
+
+    if len(kept) < image.shape[2]:
+        image = image[..., kept]
+    filtered = _correlate_stack(image, kernel, mode, tol, method,
+                                scratch(workspace, "channel_filtered", image.shape), workspace)
+    if len(kept) == len(channels):
+        return to_dtype(filtered, out.dtype, out=out)
+    plane = scratch(workspace, "channel_plane", image.shape[:2])
+    for c, (source, scale) in enumerate(channels):
+        np.multiply(filtered[..., kept.index(source)], scale, out=plane)
+        if integer:
+            to_dtype(plane, out.dtype, out=out[..., c])
+        else:
+            out[..., c] = plane
+    return out
+
+def separable_report(image, kernel, mode="nearest", tol=TOLERANCE, repeat=3):
+    """Rank, timings and error of the separable path against the direct 2-D result"""
+    factors = separable_factors(kernel, tol)
+
+    def best_time(func):
+        best = np.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+        return result, best
+
+    direct, direct_time = best_time(lambda: correlate_direct(image, kernel, mode))
+    separable, separable_time = best_time(lambda: correlate_separable(image, factors, mode))
+    return {
+        "rank": len(factors),
+        "direct_ops": int(np.asarray(kernel).size),
+        "separable_ops": len(factors) * sum(np.asarray(kernel).shape),
+        "direct_time": direct_time,
+        "separable_time": separable_time,
+        "speedup": direct_time / separable_time,
+        "max_abs_error": float(np.abs(direct - separable).max()),
+    }
+
+if __name__ == "__main__":
+    from imgproc import kernels as kernel_factory
+
+    image = np.random.default_rng(0).integers(0, 256, (480, 640)).astype(np.uint8)
+    kernels = {
+        "gaussian 31x31": kernel_factory.gaussian(31, 7.0),
+        "box 11x11": kernel_factory.box(11),
+        "laplacian 3x3": kernel_factory.laplacian(8),
+    }
+    for name, kernel in kernels.items():
+        report = separable_report(image, kernel)
+        print(f"{name}: rank {report['rank']}, {report['direct_ops']} -> {report['separable_ops']} ops/pixel, "
+              f"{report['speedup']:.1f}x faster, max error {report['max_abs_error']:.2e}")
@@ -0,0 +1,166 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy import fft
+
+from imgproc import spectral
+from imgproc.convolve import kernel_key
+
+def place_psf(psf, shape):
+    """Zero-pad a PSF to `shape` with its center moved to (0, 0), wrapping around.
+
+    Kernel element (r, c) lands on ((r - kr // 2) % rows, (c - kc // 2) % cols),
+    the placement the double loop in hw6 inverse_filter did one element at a time.
+    """
+    psf = np.asarray(psf, dtype=np.float64)
+    kr, kc = psf.shape
+    rows, cols = shape
+    padded = np.zeros(shape, dtype=np.float64)
+    padded[np.ix_((np.arange(kr) - kr // 2) % rows, (np.arange(kc) - kc // 2) % cols)] = psf
+    return padded
+
+@lru_cache(maxsize=16)
+def _otf(key, shape, real, dtype):
+    kshape, data = key
+    psf = np.frombuffer(data, dtype=np.float64).reshape(kshape)
+    padded = place_psf(psf, shape)
+    H = fft.rfft2(padded) if real else fft.fft2(padded)
+    H = H.astype(np.result_type(dtype, np.complex64))
+    H.setflags(write=False)
+    return H
+
+def psf2otf(psf, shape, real=False, dtype=np.float64):
+    """Optical transfer function of a PSF for images of `shape`, cached per (kernel, shape, real, dtype).
+
+    real=True gives the half spectrum of rfft2, for real images; dtype
+    float32 gives a complex64 OTF.
+    """
+    return _otf(kernel_key(psf), tuple(shape), real, np.dtype(dtype).str)
+
+@lru_cache(maxsize=16)
+def _otf_terms(key, shape, real, dtype):
+    H = _otf(key, shape, real, dtype)
+    H_conj = np.conj(H)
+    H_abs_sq = np.abs(H) ** 2
+    H_conj.setflags(write=False)
+    H_abs_sq.setflags(write=False)
+    return H_conj, H_abs_sq
+
+def otf_terms(psf, shape, real=False, dtype=np.float64):
+    """(conj(H), |H|**2) of psf2otf(psf, shape, real, dtype), cached alongside it"""
+    return _otf_terms(kernel_key(psf), tuple(shape), real, np.dtype(dtype).str)
+
+@lru_cache(maxsize=32)
+def _inverse_transfer(key, shape, K, real, dtype):
+    H_conj, H_abs_sq = _otf_terms(key, shape, real, dtype)
+    W = H_conj / (H_abs_sq + np.array(K, dtype=H_abs_sq.dtype))
+    W.setflags(write=False)
+    return W
+
+def inverse_transfer(psf, shape, K=1e-3, real=False, dtype=np.float64):
+    """Regularized inverse filter conj(H) / (|H|**2 + K), cached per (kernel, shape, K, real, dtype)"""
+    return _inverse_transfer(kernel_key(psf), tuple(shape), float(K), real, np.dtype(dtype).str)
+
+def inverse_filter(degraded, psf, K=1e-3, real=True, dtype=np.float64, workers=None, pad_to_fast=False):
+    """Restore an image blurred by `psf`: one forward and one inverse FFT per call.
+
+    The transfer function is cached, so a stream of frames degraded by the
+    same PSF pays for it once. real=True works on the rfft2 half spectrum,
+    which equals the real part of the complex path up to rounding; dtype
+    float32 halves the memory of both. pad_to_fast extends the image by
+    edge replication to fast FFT lengths and crops the result, which also
+    moves the wrap-around seam away from the image.
+    """
+    if not real:
+        shape = np.shape(degraded)
+        W = inverse_transfer(psf, shape, K, False, dtype)
+        spectrum = fft.fft2(np.asarray(degraded, dtype=dtype), workers=workers)
+        return np.real(fft.ifft2(spectrum * W, workers=workers))
+
+    spectrum = spectral.Spectrum(degraded, dtype, workers, pad_to_fast)
+    return spectrum.inverse(spectrum.half * inverse_transfer(psf, spectrum.shape, K, True, dtype))
+
+# Memory for the stacked per-K spectra in k_sweep
+SWEEP_MEMORY = 256 << 20
+
+CRITERIA = ("gcv", "lcurve")
+
+def _half_spectrum_weights(cols):
+    """How often each rfft2 column occurs in the full spectrum (1 for DC and Nyquist, else 2)"""
+    weights = np.full(cols // 2 + 1, 2.0)
+    weights[0] = 1.0
+    if cols % 2 == 0:
+        weights[-1] = 1.0
+    return weights
+
+def _lcurve_corner(residual, solution, Ks):
+    """Index of the largest curvature of (log residual, log solution norm) along log K"""
+    t = np.log(Ks)
+    x, y = np.log(residual), np.log(solution)
+    dx, dy = np.gradient(x, t), np.gradient(y, t)
+    ddx, ddy = np.gradient(dx, t), np.gradient(dy, t)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        curvature = (dx * ddy - dy * ddx) / (dx ** 2 + dy ** 2) ** 1.5
+    # Residual grows and solution norm shrinks with K, so the corner of the
+    # L is the largest positive curvature (end points have one-sided differences)
+    return int(np.nanargmax(curvature[1:-1])) + 1, curvature
+
+def k_sweep(degraded, psf, Ks, criterion="gcv", memory_limit=SWEEP_MEMORY, workers=None):
+    """Evaluate the inverse filter for many K at once and restore with the best one.
+
+    The degraded spectrum G is computed once. For every K the residual
+    norm ||g - h * f_K||, the solution norm ||f_K|| and the GCV score
+    N * ||g - h * f_K||**2 / trace(I - A_K)**2 follow from Parseval as sums
+    over the spectrum, evaluated as one broadcast over a (K, u, v) stack
+    split into chunks of at most `memory_limit` bytes. Only the chosen K
+    is transformed back.
+
+    criterion is 'gcv' (smallest score) or 'lcurve' (corner of the
+    log-log residual / solution norm curve, needs at least 3 K values).
+    Returns a dict with the chosen K, the restored image and the per-K
+    curves.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"Unknown criterion '{criterion}', expected one of {CRITERIA}")
+    Ks = np.sort(np.asarray(Ks, dtype=np.float64).ravel())
+    if criterion == "lcurve" and Ks.size < 3:
+        raise ValueError("The L-curve needs at least 3 values of K")
+
+    shape = np.shape(degraded)
+    n = shape[0] * shape[1]
+    G = spectral.rfft2(degraded, workers=workers)
+    H_conj, H_abs_sq = otf_terms(psf, shape, real=True)
+    weights = _half_spectrum_weights(shape[1])
+    G_abs_sq = np.abs(G) ** 2 * weights
+
+    residual = np.empty(Ks.size)
+    solution = np.empty(Ks.size)
+    trace = np.empty(Ks.size)
+    # Three float64 spectra per K are alive at once
+    chunk = max(1, int(memory_limit // (3 * H_abs_sq.nbytes)))
+    for start in range(0, Ks.size, chunk):
+        K = Ks[start:start + chunk, None, None]
+        denom = H_abs_sq + K
+        # 1 - |H|^2 / (|H|^2 + K): the part of each frequency the filter leaves in the residual
+        left = K / denom
+        residual[start:start + chunk] = np.sum(left ** 2 * G_abs_sq, axis=(1, 2)) / n
+        trace[start:start + chunk] = np.sum(left * weights, axis=(1, 2))
+        solution[start:start + chunk] = np.sum(H_abs_sq / denom ** 2 * G_abs_sq, axis=(1, 2)) / n
+
+    gcv = n * residual / trace ** 2
+    if criterion == "gcv":
+        best, curvature = int(np.argmin(gcv)), None
+    else:
+        best, curvature = _lcurve_corner(residual, solution, Ks)
+
+    K = Ks[best]
+    restored = spectral.irfft2(G * inverse_transfer(psf, shape, K, real=True), shape, workers)
+    return {
+        "K": float(K),
+        "restored": restored,
+        "Ks": Ks,
+        "residual": np.sqrt(residual),
+        "solution_norm": np.sqrt(solution),
+        "gcv": gcv,
+        "curvature": curvature,
+    }
@@ -0,0 +1,88 @@
+import numpy as np
+
+from imgproc import means, minmax, rank
+from imgproc.border import check_size
+from imgproc.box import IntegralImage
+
+# Family names as used by filter_name in hw5/hw_2.py
+FAMILIES = ("arithmetic", "geometric", "harmonic", "contraharmonic_pos", "contraharmonic_neg",
+            "median", "max", "min", "midpoint")
+
+class FilterBank:
+    """Lazy results of several filter families at several window sizes of one image.
+
+    Nothing is computed until bank[family, size] is read. The first read of
+    a family prepares what all its sizes share, padded once for the largest
+    size: one summed-area table per transformed image for the means, one
+    running max / min grown from the next smaller size (9x9 from 7x7), and
+    one gray-level sweep that yields the medians of every size together.
+    Each result is then cached.
+
+    Results have the types of the hw5 filter functions: the image dtype,
+    except geometric and harmonic (float64). `modes` overrides the border
+    mode per family; `bias` is the contraharmonic denominator bias.
+    """
+
+    def __init__(self, image, families=FAMILIES, sizes=(3, 7, 9), mode="reflect", modes=None, Q=1.0,
+                 bias=0.0):
+        unknown = set(families) - set(FAMILIES)
+        if unknown:
+            raise ValueError(f"Unknown filter families {sorted(unknown)}, expected any of {FAMILIES}")
+        for size in sizes:
+            check_size(size)
+        self.image = np.asarray(image)
+        self.families = tuple(families)
+        self.sizes = tuple(sorted(set(sizes)))
+        self.max_size = self.sizes[-1]
+        self.modes = {family: mode for family in FAMILIES}
+        self.modes.update(modes or {})
+        self.Q = Q
+        self.bias = bias
+        self._prepared = {}
+        self._results = {}
+
+    def _shared(self, key, build):
+        if key not in self._prepared:
+            self._prepared[key] = build()
+        return self._prepared[key]
+
+    def _extremum(self, op, mode):
+        return self._shared((op.__name__, mode), lambda: minmax.RunningExtremum(self.image, op, mode, self.max_size))
+
+    def _compute(self, family, size):
+        image, mode, max_size = self.image, self.modes[family], self.max_size
+        if family == "arithmetic":
+            table = self._shared(family, lambda: IntegralImage(image, mode, max_size))
+            return table.box_mean(size).astype(image.dtype)
+        if family == "geometric":
+            return self._shared(family, lambda: means.GeometricMean(image, mode, max_size))(size)
+        if family == "harmonic":
+            return self._shared(family, lambda: means.HarmonicMean(image, mode, max_size))(size)
+        if family in ("contraharmonic_pos", "contraharmonic_neg"):
+            Q = self.Q if family == "contraharmonic_pos" else -self.Q
+            contraharmonic = self._shared(family, lambda: means.ContraharmonicMean(image, Q, mode, max_size, self.bias))
+            return contraharmonic(size).astype(image.dtype)
+        if family == "median":
+            medians = self._shared(family, lambda: rank.rank_filters(image, self.sizes, 50, mode))
+            return medians[size]
+        if family == "max":
+            return np.array(self._extremum(np.maximum, mode)(size))
+        if family == "min":
+            return np.array(self._extremum(np.minimum, mode)(size))
+        hi = self._extremum(np.maximum, mode)(size)
+        lo = self._extremum(np.minimum, mode)(size)
+        return (0.5 * (hi.astype(np.float64) + lo)).astype(image.dtype)
+
+    def __getitem__(self, key):
+        family, size = key
+        if family not in self.families:
+            raise KeyError(f"Filter family '{family}' is not in this bank {self.families}")
+        if size not in self.sizes:
+            raise KeyError(f"Window size {size} is not in this bank {self.sizes}")
+        if key not in self._results:
+            self._results[key] = self._compute(family, size)
+        return self._results[key]
+
+    def family(self, name):
+        """{size: result} for every size of one family"""
+        return {size: self[name, size] for size in self.sizes}
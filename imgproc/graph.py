@@ -0,0 +1,142 @@
+"""Lazy, memoized operation graph for exploratory runs.
+
+    graph = Graph(memory_budget=64 << 20)
+    image = graph.load("triangle")
+    edges = image.correlate(LAPLACIAN).normalize()
+    plt.imshow(edges.value())      # only now is anything computed
+
+Every node is keyed by (input keys, operation, parameters), so building the
+same node twice, in any script or notebook cell, evaluates it once.
+"""
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from imgproc.convolve import correlate
+from imgproc.lut import gamma_lut
+from imgproc.raw_io import load_raw, raw_path
+
+def freeze(value):
+    """Hashable stand-in for an operation parameter (arrays by value)"""
+    if isinstance(value, np.ndarray):
+        return ("array", value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    hash(value)
+    return value
+
+def _load(path, shape=None, dtype=None, mtime=None):
+    # mtime only enters the key, so an edited file is read again
+    return load_raw(path, shape, dtype)
+
+def _lut(image, table):
+    return np.take(table, image, mode="clip")
+
+def _gamma(image, gamma, L=256):
+    return gamma_lut(gamma, L)[image]
+
+def _correlate(image, kernel, mode="nearest"):
+    return correlate(image, kernel, mode)
+
+def _fft_magnitude(image):
+    """log(1 + |F|) with DC in the center, as in hw4/hw_b"""
+    return np.log1p(np.abs(np.fft.fftshift(np.fft.fft2(image))))
+
+def _normalize(image, L=256):
+    """Shift the minimum to 0 and stretch the maximum to L - 1 (hw4 rescale)"""
+    out = np.asarray(image, dtype=np.float64) - np.min(image)
+    if out.max() > 0:
+        out *= (L - 1) / out.max()
+    return out.astype(np.uint8 if L <= 256 else np.uint16)
+
+class Node:
+    """One operation in a Graph; nothing is computed until value() is called"""
+
+    def __init__(self, graph, func, inputs, params, key):
+        self.graph = graph
+        self.func = func
+        self.inputs = inputs
+        self.params = params
+        self.key = key
+
+    def value(self):
+        return self.graph.evaluate(self)
+
+    def then(self, func, **params):
+        """Node applying func(self.value(), **params)"""
+        return self.graph.apply(func, self, **params)
+
+    def lut(self, table):
+        return self.then(_lut, table=np.asarray(table))
+
+    def gamma(self, gamma, L=256):
+        return self.then(_gamma, gamma=gamma, L=L)
+
+    def correlate(self, kernel, mode="nearest"):
+        return self.then(_correlate, kernel=np.asarray(kernel, dtype=np.float64), mode=mode)
+
+    def fft(self):
+        return self.then(_fft_magnitude)
+
+    def normalize(self, L=256):
+        return self.then(_normalize, L=L)
+
+    def __repr__(self):
+        return f"Node({getattr(self.func, '__name__', self.func)}, {len(self.inputs)} inputs)"
+
+class Graph:
+    """Builds Nodes and memoizes their values under an LRU memory budget.
+
+    When the cached values exceed `memory_budget` bytes, the least recently
+    used ones are dropped (and recomputed from their inputs if needed again).
+    """
+
+    def __init__(self, memory_budget=None):
+        self.memory_budget = memory_budget
+        self._cache = OrderedDict()
+        self._sources = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self):
+        return sum(getattr(value, "nbytes", 0) for value in self._cache.values())
+
+    def source(self, image):
+        """Node for an in-memory array, keyed by the array's identity"""
+        key = ("source", id(image))
+        # Holding the array keeps its id from being reused by another object
+        self._sources[key] = image
+        return Node(self, None, (), {}, key)
+
+    def load(self, path, shape=None, dtype=None):
+        """Node reading a raw image; the file's modification time is part of the key"""
+        resolved = os.path.abspath(raw_path(path))
+        mtime = os.stat(resolved).st_mtime_ns if os.path.exists(resolved) else None
+        return self.apply(_load, path=resolved, shape=shape, dtype=dtype, mtime=mtime)
+
+    def apply(self, func, *inputs, **params):
+        key = (func, tuple(node.key for node in inputs), freeze(params))
+        return Node(self, func, inputs, params, key)
+
+    def evaluate(self, node):
+        if node.func is None:
+            return self._sources[node.key]
+        if node.key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(node.key)
+            return self._cache[node.key]
+
+        self.misses += 1
+        value = node.func(*[self.evaluate(n) for n in node.inputs], **node.params)
+        self._cache[node.key] = value
+        if self.memory_budget is not None:
+            while self.nbytes > self.memory_budget and len(self._cache) > 1:
+                self._cache.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._cache.clear()
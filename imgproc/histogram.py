@@ -0,0 +1,90 @@
+import numpy as np
+
+from imgproc.lut import equalization_mapping
+from imgproc.raw_io import load_raw
+
+# Pixels handed to np.bincount at once; it widens its input to intp, so
+# chunking keeps that temporary small instead of 8x the image
+CHUNK_PIXELS = 1 << 20
+
+class Histogram:
+    """Gray level counts that can be accumulated chunk by chunk and merged.
+
+    Equalization, plotting and statistics all read the same counts, so an
+    image only has to be binned once.
+    """
+
+    def __init__(self, L=256, counts=None):
+        self.L = L
+        self.counts = np.zeros(L, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    def update(self, chunk):
+        """Add the pixels of an integer array (any shape, e.g. one strip of a memmap)"""
+        flat = np.asarray(chunk).reshape(-1)
+        for start in range(0, flat.size, CHUNK_PIXELS):
+            self.counts += np.bincount(flat[start:start + CHUNK_PIXELS], minlength=self.L)[:self.L]
+        return self
+
+    def merge(self, other):
+        """Add the counts of a histogram computed elsewhere (e.g. in another worker)"""
+        if other.L != self.L:
+            raise ValueError(f"Cannot merge histograms with {self.L} and {other.L} levels")
+        self.counts += other.counts
+        return self
+
+    def __add__(self, other):
+        return Histogram(self.L, self.counts.copy()).merge(other)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def cdf(self):
+        return self.counts.cumsum()
+
+    def mean(self):
+        return float(np.dot(np.arange(self.L), self.counts) / self.total)
+
+    def var(self):
+        levels = np.arange(self.L)
+        return float(np.dot((levels - self.mean()) ** 2, self.counts) / self.total)
+
+    def std(self):
+        return self.var() ** 0.5
+
+    def min(self):
+        return int(np.flatnonzero(self.counts)[0])
+
+    def max(self):
+        return int(np.flatnonzero(self.counts)[-1])
+
+    def percentile(self, q):
+        """Lowest level whose cumulative count reaches q percent of the pixels"""
+        target = self.total * q / 100.0
+        return int(np.searchsorted(self.cdf(), target, side="left"))
+
+    def median(self):
+        return self.percentile(50)
+
+    def equalization_mapping(self):
+        return equalization_mapping(self.counts, self.L)
+
+def histogram(image, L=256):
+    """Histogram of an integer image without flattening it into a copy"""
+    return Histogram(L).update(image)
+
+def histogram_raw(path, L=256, strip_rows=256):
+    """Histogram of a raw file, reading one strip of the memmap at a time"""
+    image = load_raw(path)
+    hist = Histogram(L)
+    for start in range(0, image.shape[0], strip_rows):
+        hist.update(image[start:start + strip_rows])
+    return hist
+
+def merge_histograms(histograms):
+    """Sum partial histograms, e.g. the results of several batch workers"""
+    histograms = list(histograms)
+    total = Histogram(histograms[0].L)
+    for hist in histograms:
+        total.merge(hist)
+    return total
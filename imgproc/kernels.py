@@ -0,0 +1,68 @@
+"""Filter kernels from their closed forms, cached per parameter set.
+
+Every kernel is a read-only float64 array. Separable kernels also come as
+1-D factors, and those exact factors are registered with imgproc.convolve
+(which keeps as many as these caches hold), so correlate() runs them as
+two 1-D passes without an SVD.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from imgproc.border import check_size
+from imgproc.convolve import register_factors, separable_factors
+
+def _frozen(array):
+    array.setflags(write=False)
+    return array
+
+@lru_cache(maxsize=64)
+def gaussian_1d(size, sigma):
+    """Normalized samples of exp(-x**2 / (2 sigma**2)) at x = -(size // 2) .. size // 2"""
+    check_size(size)
+    x = np.arange(size) - size // 2
+    g = np.exp(-x ** 2 / (2.0 * sigma ** 2))
+    return _frozen(g / g.sum())
+
+@lru_cache(maxsize=64)
+def gaussian(size, sigma):
+    """size x size Gaussian normalized to sum 1, the outer product of two gaussian_1d"""
+    g = gaussian_1d(size, sigma)
+    kernel = _frozen(np.outer(g, g))
+    register_factors(kernel, ((g, g),))
+    return kernel
+
+@lru_cache(maxsize=64)
+def box_1d(size):
+    check_size(size)
+    return _frozen(np.full(size, 1.0 / size))
+
+@lru_cache(maxsize=64)
+def box(size):
+    """size x size averaging kernel"""
+    b = box_1d(size)
+    kernel = _frozen(np.outer(b, b))
+    register_factors(kernel, ((b, b),))
+    return kernel
+
+@lru_cache(maxsize=8)
+def laplacian(neighbors=8):
+    """3x3 Laplacian with a negative center: -4 (4-neighbor) or -8 (8-neighbor, as in hw4)"""
+    if neighbors == 4:
+        kernel = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]], dtype=np.float64)
+    elif neighbors == 8:
+        kernel = np.array([[1, 1, 1], [1, -8, 1], [1, 1, 1]], dtype=np.float64)
+    else:
+        raise ValueError("neighbors must be 4 or 8")
+    return _frozen(kernel)
+
+@lru_cache(maxsize=8)
+def sharpen(neighbors=8):
+    """Identity minus the Laplacian: 9 in the center of -1s for 8 neighbors (hw4), 5 for 4"""
+    identity = np.zeros((3, 3))
+    identity[1, 1] = 1.0
+    return _frozen(identity - laplacian(neighbors))
+
+def factors(kernel):
+    """1-D (column, row) factor pairs of a kernel, exact for the ones built here"""
+    return separable_factors(kernel)
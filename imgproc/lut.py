@@ -0,0 +1,97 @@
+from functools import lru_cache
+
+import numpy as np
+
+ROUNDING = ("truncate", "round")
+
+def lut_dtype(L):
+    """Smallest unsigned integer type that holds gray levels 0 .. L-1"""
+    return np.uint8 if L <= 256 else np.uint16 if L <= 65536 else np.uint32
+
+@lru_cache(maxsize=512)
+def gamma_lut(gamma, L=256, rounding="truncate"):
+    """Power-law lookup table s = (L-1) * (r / (L-1)) ** gamma for r = 0 .. L-1.
+
+    rounding="truncate" matches power_law_transform in hw2/hw_1.py (int()),
+    "round" rounds to the nearest level. Works for any bit depth
+    (L = 2 ** bits). Tables are cached and returned read-only.
+    """
+    if rounding not in ROUNDING:
+        raise ValueError(f"Unknown rounding '{rounding}', expected one of {ROUNDING}")
+
+    levels = np.arange(L, dtype=np.float64)
+    table = (levels / (L - 1)) ** gamma * (L - 1)
+    table = np.floor(table) if rounding == "truncate" else np.floor(table + 0.5)
+    table = np.clip(table, 0, L - 1).astype(lut_dtype(L))
+    table.setflags(write=False)
+    return table
+
+def equalization_mapping(histogram, L=256):
+    """Histogram equalization table from a histogram, as in hw2/hw_2.py"""
+    cdf = histogram.cumsum()
+    cdf_normalized = (cdf - cdf.min()) * (L - 1) / (cdf.max() - cdf.min())
+    return cdf_normalized.astype(lut_dtype(L))
+
+def compose(*tables):
+    """Single table equivalent to applying tables[0], then tables[1], ..."""
+    combined = tables[0]
+    for table in tables[1:]:
+        combined = table[combined]
+    return combined
+
+class PointPipeline:
+    """Chain of per-pixel gray level transforms applied as one lookup table.
+
+        pipeline = PointPipeline().gamma(0.4).equalize().clip(16, 235)
+        pipeline.apply(image, out=image)
+
+    Each step is folded into a single L-entry table, so the image is gathered
+    once instead of once per step. equalize() depends on the image; its
+    histogram is pushed through the preceding steps instead of re-reading the
+    transformed image.
+    """
+
+    def __init__(self, L=256):
+        self.L = L
+        self.steps = []
+
+    def lut(self, table):
+        self.steps.append(np.asarray(table))
+        return self
+
+    def map(self, func):
+        """Any vectorized gray level function, evaluated once on 0 .. L-1"""
+        levels = np.arange(self.L)
+        table = np.clip(func(levels), 0, self.L - 1)
+        return self.lut(np.asarray(table).astype(lut_dtype(self.L)))
+
+    def gamma(self, gamma, rounding="truncate"):
+        return self.lut(gamma_lut(gamma, self.L, rounding))
+
+    def clip(self, low=0, high=None):
+        high = self.L - 1 if high is None else high
+        return self.lut(np.clip(np.arange(self.L), low, high).astype(lut_dtype(self.L)))
+
+    def equalize(self):
+        self.steps.append(None)
+        return self
+
+    def table(self, image=None):
+        """The fused table; image is only needed when the pipeline has equalize() steps"""
+        current = np.arange(self.L, dtype=lut_dtype(self.L))
+        histogram = None
+        for step in self.steps:
+            if step is None:
+                if image is None:
+                    raise ValueError("equalize() needs the image to build its table")
+                if histogram is None:
+                    histogram = np.bincount(np.asarray(image).reshape(-1), minlength=self.L)
+                # Histogram after the steps so far, without touching the image again
+                moved = np.bincount(current, weights=histogram, minlength=self.L)
+                step = equalization_mapping(moved, self.L)
+            current = step[current]
+        return current.astype(lut_dtype(self.L))
+
+    def apply(self, image, out=None):
+        """One gather over the image; out may be the image itself for in-place use"""
+        return np.take(self.table(image), image, out=out, mode="clip")
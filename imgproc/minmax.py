@@ -0,0 +1,141 @@
+import numpy as np
+
+from imgproc.border import check_size, pad
+from imgproc.workspace import scratch
+
+def _blocks(a, size, mode, workspace=None, name="blocks"):
+    """Pad axis 0 for a centered window and cut it into blocks of `size` rows.
+
+    Returns the padded array shaped (blocks * size, ...) and its row count n
+    of real output rows.
+    """
+    n = a.shape[0]
+    r = size // 2
+    rows = n + 2 * r
+    padded = scratch(workspace, name, (rows + -rows % size,) + a.shape[1:], a.dtype)
+    widths = [(r, r)] + [(0, 0)] * (a.ndim - 1)
+    pad(a, widths, mode=mode, out=padded[:rows])
+    padded[rows:] = padded[rows - 1]
+    return padded, n
+
+def _running(padded, n, size, op, out=None, workspace=None):
+    """van Herk / Gil-Werman running extremum along axis 0 (3 comparisons per pixel).
+
+    g is the running extremum from the start of each block, h the running
+    extremum to its end; a window starting at x spans at most two blocks,
+    so its extremum is op(h[x], g[x + size - 1]).
+    """
+    blocks = padded.reshape((-1, size) + padded.shape[1:])
+    g = scratch(workspace, "running_g", padded.shape, padded.dtype)
+    h = scratch(workspace, "running_h", padded.shape, padded.dtype)
+    op.accumulate(blocks, axis=1, out=g.reshape(blocks.shape))
+    op.accumulate(blocks[:, ::-1], axis=1, out=h.reshape(blocks.shape)[:, ::-1])
+    return op(h[:n], g[size - 1:size - 1 + n], out=out)
+
+def _max_min_axis0(image, size, mode, out_max=None, out_min=None, workspace=None):
+    padded, n = _blocks(image, size, mode, workspace)
+    return (_running(padded, n, size, np.maximum, out_max, workspace),
+            _running(padded, n, size, np.minimum, out_min, workspace))
+
+def max_min_filter(image, size, mode="nearest", out=None, workspace=None):
+    """Maximum and minimum over every size x size window, sharing padding and blocking.
+
+    Separable: the row pass runs on the transposed column-pass results. The
+    cost per pixel is the same for a 3x3 as for a 31x31 window. `out` is an
+    optional (max, min) pair of arrays to write into.
+    """
+    check_size(size)
+    image = np.asarray(image)
+    out_max, out_min = (None, None) if out is None else out
+    hi, lo = _max_min_axis0(image, size, mode, scratch(workspace, "column_max", image.shape, image.dtype),
+                            scratch(workspace, "column_min", image.shape, image.dtype), workspace)
+    padded_max, n = _blocks(hi.T, size, mode, workspace)
+    hi = _running(padded_max, n, size, np.maximum, None if out_max is None else out_max.T, workspace)
+    padded_min, n = _blocks(lo.T, size, mode, workspace)
+    lo = _running(padded_min, n, size, np.minimum, None if out_min is None else out_min.T, workspace)
+    return hi.T, lo.T
+
+def _extremum_filter(image, size, mode, op, out, workspace):
+    check_size(size)
+    image = np.asarray(image)
+    columns = _running(*_blocks(image, size, mode, workspace), size, op,
+                       scratch(workspace, "column_pass", image.shape, image.dtype), workspace)
+    rows = _running(*_blocks(columns.T, size, mode, workspace), size, op,
+                    None if out is None else out.T, workspace)
+    return rows.T if out is None else out
+
+def maximum_filter(image, size, mode="nearest", out=None, workspace=None):
+    return _extremum_filter(image, size, mode, np.maximum, out, workspace)
+
+def minimum_filter(image, size, mode="nearest", out=None, workspace=None):
+    return _extremum_filter(image, size, mode, np.minimum, out, workspace)
+
+def _valid_axis0(padded, size, op):
+    """Running extremum of every full window along axis 0 (no border handling)"""
+    n = padded.shape[0] - size + 1
+    extra = -padded.shape[0] % size
+    if extra:
+        padded = np.concatenate([padded, np.repeat(padded[-1:], extra, axis=0)])
+    return _running(padded, n, size, op)
+
+def _grow_axis0(valid, small, large, op):
+    """Windows of `large` rows from windows of `small` rows.
+
+    A window of `large` rows starting at i is covered by the `small`-row
+    windows starting at i, i + small, ... and i + large - small, so 9x9 from
+    7x7 is a single comparison per pixel and axis.
+    """
+    n = valid.shape[0] - (large - small)
+    shifts = list(range(0, large - small, small)) + [large - small]
+    out = valid[:n].copy()
+    for shift in shifts[1:]:
+        op(out, valid[shift:shift + n], out=out)
+    return out
+
+class RunningExtremum:
+    """Maximum (op=np.maximum) or minimum filter for many window sizes of one image.
+
+    The image is padded once for max_size. Every computed size is kept as a
+    'valid' result on the padded grid, and a new size is grown from the
+    largest cached smaller one instead of starting over. Results are
+    read-only views of the cache.
+    """
+
+    def __init__(self, image, op, mode="nearest", max_size=31):
+        check_size(max_size)
+        self.image = np.asarray(image)
+        self.op = op
+        self.radius = max_size // 2
+        self.padded = pad(self.image, self.radius, mode=mode)
+        self.cache = {}
+
+    def valid(self, size):
+        """Extremum of every size x size window of the padded image"""
+        check_size(size)
+        if size // 2 > self.radius:
+            raise ValueError(f"Window size {size} exceeds max_size {2 * self.radius + 1}")
+        if size not in self.cache:
+            smaller = [s for s in self.cache if s < size]
+            if smaller:
+                base = max(smaller)
+                out = _grow_axis0(self.cache[base], base, size, self.op)
+                out = _grow_axis0(out.T, base, size, self.op).T
+            else:
+                out = _valid_axis0(self.padded, size, self.op)
+                out = _valid_axis0(out.T, size, self.op).T
+            out.setflags(write=False)
+            self.cache[size] = out
+        return self.cache[size]
+
+    def __call__(self, size):
+        rows, cols = self.image.shape
+        offset = self.radius - size // 2
+        return self.valid(size)[offset:offset + rows, offset:offset + cols]
+
+def midpoint_filter(image, size, mode="nearest", out=None, workspace=None):
+    """(max + min) / 2 of every window, as float64"""
+    image = np.asarray(image)
+    hi, lo = max_min_filter(image, size, mode, (scratch(workspace, "midpoint_max", image.shape, image.dtype),
+                                                scratch(workspace, "midpoint_min", image.shape, image.dtype)), workspace)
+    out = np.add(hi, lo, out=out, dtype=np.float64)
+    return np.multiply(out, 0.5, out=out)
@@ -0,0 +1,100 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from imgproc.resample import resize
+
+# 5-tap binomial low-pass applied before every 2x decimation
+BINOMIAL_5 = np.array([1, 4, 6, 4, 1], dtype=np.float32) / 16
+
+def _lowpass_axis(image, axis):
+    pad = [(0, 0)] * image.ndim
+    pad[axis] = (2, 2)
+    padded = np.pad(image, pad, mode="edge")
+    n = image.shape[axis]
+    out = np.zeros(image.shape, dtype=np.float32)
+    for k, w in enumerate(BINOMIAL_5):
+        out += w * np.take(padded, np.arange(k, k + n), axis=axis)
+    return out
+
+def reduce_level(image):
+    """Low-pass with the binomial kernel (edge replication), then keep every 2nd row/column"""
+    smooth = _lowpass_axis(_lowpass_axis(image.astype(np.float32), 0), 1)
+    smooth = smooth[::2, ::2]
+    if np.issubdtype(image.dtype, np.integer):
+        info = np.iinfo(image.dtype)
+        return np.clip(np.round(smooth), info.min, info.max).astype(image.dtype)
+    return smooth.astype(image.dtype)
+
+class Pyramid:
+    """Anti-aliased 2x image pyramid, built lazily and cached under a memory budget.
+
+    Level k has the shape of image[::2**k, ::2**k]. Levels are built from the
+    closest finer level still in the cache. When the cache is over
+    `memory_budget` bytes the least recently used levels are evicted (the
+    full-resolution image is never evicted).
+    """
+
+    def __init__(self, image, memory_budget=None):
+        self.image = image
+        self.memory_budget = memory_budget
+        self._cache = OrderedDict()
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self._cache.values())
+
+    def _get(self, key):
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        return None
+
+    def _put(self, key, value):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if self.memory_budget is None:
+            return
+        while self.nbytes > self.memory_budget and len(self._cache) > 1:
+            self._cache.popitem(last=False)
+
+    def level(self, k):
+        """Level k of the pyramid (1/2**k of the original resolution)"""
+        if k == 0:
+            return self.image
+        cached = self._get(("level", k))
+        if cached is not None:
+            return cached
+
+        # Start from the finest cached level below k
+        start = max([j for (kind, j) in self._cache if kind == "level" and j < k], default=0)
+        current = self.level(start)
+        for j in range(start + 1, k + 1):
+            current = reduce_level(current)
+            self._put(("level", j), current)
+        return current
+
+    def subsample(self, factor, antialias=True):
+        """Same shape as subsample(image, factor) in hw1, served from the nearest pyramid level"""
+        if factor < 1:
+            raise ValueError("factor must be >= 1")
+        if not antialias or factor == 1:
+            return self.image[::factor, ::factor]
+
+        k = int(math.log2(factor))
+        if 2 ** k == factor:
+            return self.level(k)
+
+        cached = self._get(("factor", factor))
+        if cached is not None:
+            return cached
+
+        # Remaining factor is < 2, a bilinear resize from level k no longer aliases much
+        target = tuple(-(-n // factor) for n in self.image.shape[:2])
+        result = resize(self.level(k), target, method="bilinear")
+        self._put(("factor", factor), result)
+        return result
+
+    def clear(self):
+        self._cache.clear()
@@ -0,0 +1,107 @@
+import numpy as np
+
+from imgproc import minmax
+from imgproc.border import check_size, pad
+from imgproc.workspace import scratch
+
+def _check_integer(image):
+    if not np.issubdtype(image.dtype, np.integer):
+        raise TypeError("rank_filter expects an integer image")
+
+# Pixels per bincount call in _levels; bincount casts its input to intp,
+# so it is fed through a buffer of this size instead of the whole image
+LEVEL_CHUNK = 1 << 16
+
+def _levels(padded, workspace=None):
+    """Distinct gray levels, sorted"""
+    if not np.issubdtype(padded.dtype, np.unsignedinteger) or padded.dtype.itemsize > 2:
+        return np.unique(padded)
+    flat = padded.reshape(-1)
+    chunk = scratch(workspace, "rank_level_chunk", (min(LEVEL_CHUNK, flat.size),), np.intp)
+    counts = np.zeros(int(flat.max()) + 1, dtype=np.intp)
+    for start in range(0, flat.size, chunk.size):
+        part = chunk[:min(chunk.size, flat.size - start)]
+        np.copyto(part, flat[start:start + part.size])
+        counts += np.bincount(part, minlength=counts.size)
+    return np.flatnonzero(counts).astype(padded.dtype)
+
+def _rank_sweep(image, sizes, percentile, mode, outs, workspace):
+    """Write the rank filter of every size into outs[size] (arrays of the image dtype).
+
+    Threshold decomposition: the output is the smallest gray level v whose
+    window count of pixels <= v exceeds the rank, so each distinct level in
+    the image costs one mask and one summed-area table, shared by all sizes.
+    Every output starts at the lowest level and steps up to the next level
+    wherever the count is still <= rank, so it never leaves the image's own
+    range and is accumulated in the image dtype.
+    """
+    radius = max(sizes) // 2
+    rows, cols = image.shape
+    shape = (rows + 2 * radius, cols + 2 * radius)
+    padded = pad(image, radius, mode=mode, out=scratch(workspace, "rank_pad", shape, image.dtype))
+    levels = _levels(padded, workspace)
+
+    table = scratch(workspace, "rank_table", (shape[0] + 1, shape[1] + 1), np.int32)
+    table[0] = 0
+    table[:, 0] = 0
+    counts = scratch(workspace, "rank_counts", image.shape, np.int32)
+    above = scratch(workspace, "rank_above", image.shape, np.bool_)
+
+    for out in outs.values():
+        out[...] = levels[0]
+    for low, high in zip(levels[:-1], levels[1:]):
+        np.less_equal(padded, low, out=table[1:, 1:], casting="unsafe")
+        np.cumsum(table[1:, 1:], axis=0, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        for size, out in outs.items():
+            n = size * size
+            rank = min(int(n * percentile / 100.0), n - 1)
+            lo = radius - size // 2
+            hi = radius + size // 2 + 1
+            np.subtract(table[hi:hi + rows, hi:hi + cols], table[lo:lo + rows, hi:hi + cols], out=counts)
+            np.subtract(counts, table[hi:hi + rows, lo:lo + cols], out=counts)
+            np.add(counts, table[lo:lo + rows, lo:lo + cols], out=counts)
+            # Where at most `rank` pixels are <= low, the answer is above low
+            np.less_equal(counts, rank, out=above)
+            np.add(out, high - low, out=out, where=above)
+    return outs
+
+def rank_filter(image, size, percentile=50, mode="nearest", out=None, workspace=None):
+    """Percentile of every size x size window of an integer image.
+
+    The rank is int(n * percentile / 100) as in
+    scipy.ndimage.percentile_filter (0 -> minimum, 100 -> maximum). With a
+    workspace, repeated calls on equal-size frames allocate nothing that
+    grows with the image.
+    """
+    check_size(size)
+    _check_integer(image)
+    image = np.asarray(image)
+    if out is None:
+        out = np.empty(image.shape, dtype=image.dtype)
+    return _rank_sweep(image, (size,), percentile, mode, {size: out}, workspace)[size]
+
+def rank_filters(image, sizes, percentile=50, mode="nearest", workspace=None):
+    """rank_filter for several window sizes in one sweep over the gray levels.
+
+    The image is padded once for the largest size and each level's mask is
+    summed into one summed-area table, which then gives the window counts of
+    every size with four lookups. Returns {size: filtered image}.
+    """
+    sizes = sorted(set(sizes))
+    for size in sizes:
+        check_size(size)
+    _check_integer(image)
+    image = np.asarray(image)
+    outs = {size: np.empty(image.shape, dtype=image.dtype) for size in sizes}
+    return _rank_sweep(image, sizes, percentile, mode, outs, workspace)
+
+def median_filter(image, size, mode="nearest", out=None, workspace=None):
+    return rank_filter(image, size, 50, mode, out, workspace)
+
+def maximum_filter(image, size, mode="nearest", out=None, workspace=None):
+    # The extreme ranks have a cheaper dedicated algorithm
+    return minmax.maximum_filter(image, size, mode, out, workspace)
+
+def minimum_filter(image, size, mode="nearest", out=None, workspace=None):
+    return minmax.minimum_filter(image, size, mode, out, workspace)
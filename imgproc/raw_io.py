@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Raw images used in the homework: name -> (shape, dtype)
+FORMATS = {
+    "cat": ((480, 640), np.uint8),
+    "triangle": ((480, 640), np.uint8),
+    "stripes": ((256, 256), np.uint8),
+}
+
+def register_format(name, shape, dtype=np.uint8):
+    """Register the shape and dtype of a raw image by file name (without .raw)"""
+    FORMATS[name] = (tuple(shape), np.dtype(dtype).type)
+
+def raw_path(path):
+    """Accept either 'cat' or 'cat.raw' and return the .raw path"""
+    path = Path(path)
+    if path.suffix != ".raw":
+        path = path.with_name(path.name + ".raw")
+    return path
+
+def descriptor_path(path):
+    """Sidecar descriptor of a raw file: cat.raw -> cat.json"""
+    return raw_path(path).with_suffix(".json")
+
+def read_descriptor(path):
+    """Read the sidecar descriptor, returns (shape, dtype, offset) or None"""
+    desc = descriptor_path(path)
+    if not desc.exists():
+        return None
+    with open(desc, "r") as f:
+        info = json.load(f)
+    return tuple(info["shape"]), np.dtype(info.get("dtype", "uint8")), int(info.get("offset", 0))
+
+def write_descriptor(path, shape, dtype, offset=0):
+    """Write a sidecar descriptor so the raw file can be opened without a registry entry"""
+    info = {"shape": [int(s) for s in shape], "dtype": np.dtype(dtype).name, "offset": int(offset)}
+    with open(descriptor_path(path), "w") as f:
+        json.dump(info, f)
+
+def raw_format(path):
+    """Look up (shape, dtype, offset): sidecar descriptor first, then the registry"""
+    info = read_descriptor(path)
+    if info is not None:
+        return info
+
+    name = raw_path(path).stem
+    if name not in FORMATS:
+        raise ValueError(f"Unknown raw format for '{raw_path(path)}': register it or add a sidecar descriptor")
+    shape, dtype = FORMATS[name]
+    return shape, np.dtype(dtype), 0
+
+def load_raw(path, shape=None, dtype=None):
+    """Memory-map a raw image as a read-only array (zero copy, pages are read on access).
+
+    shape and dtype default to the descriptor or the registry; a file in
+    neither only needs a shape and is then taken as uint8.
+    """
+    path = raw_path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"'{path}' not found.")
+
+    offset = 0
+    if shape is None or dtype is None:
+        # A shape given for a file that is neither described nor registered is read as 8-bit
+        if shape is not None and read_descriptor(path) is None and path.stem not in FORMATS:
+            known_shape, known_dtype = shape, np.uint8
+        else:
+            known_shape, known_dtype, offset = raw_format(path)
+        shape = known_shape if shape is None else shape
+        dtype = known_dtype if dtype is None else dtype
+    shape = tuple(shape)
+    dtype = np.dtype(dtype)
+
+    expected = offset + int(np.prod(shape)) * dtype.itemsize
+    actual = path.stat().st_size
+    if actual < expected:
+        raise ValueError(f"Not enough data in '{path}': expected {expected} bytes, got {actual}")
+
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+def create_raw(path, shape, dtype=np.uint8):
+    """Create a writable memory-mapped raw file together with its sidecar descriptor"""
+    path = raw_path(path)
+    image = np.memmap(path, dtype=dtype, mode="w+", shape=tuple(shape))
+    write_descriptor(path, shape, dtype)
+    return image
+
+def save_raw(path, image):
+    """Write an array to a raw file (plus descriptor) in C order"""
+    path = raw_path(path)
+    np.ascontiguousarray(image).tofile(path)
+    write_descriptor(path, image.shape, image.dtype)
@@ -0,0 +1,83 @@
+from functools import lru_cache
+
+import numpy as np
+
+METHODS = ("nearest", "bilinear", "bicubic")
+
+def _nearest_axis(src, dst):
+    # Same index as nearest_neighbor_interpolation in hw1/hw.py: int(i / (dst / src))
+    idx = (np.arange(dst) / (dst / src)).astype(np.intp)
+    return np.minimum(idx, src - 1)[:, None], np.ones((dst, 1))
+
+def _bilinear_axis(src, dst):
+    # Pixel-center alignment, b(x) = (1 - t) * f(x0) + t * f(x0 + 1)
+    x = (np.arange(dst) + 0.5) * (src / dst) - 0.5
+    x = np.clip(x, 0, src - 1)
+    x0 = np.floor(x).astype(np.intp)
+    t = x - x0
+    idx = np.stack([x0, np.minimum(x0 + 1, src - 1)], axis=1)
+    weights = np.stack([1 - t, t], axis=1)
+    return idx, weights
+
+def _cubic(t, a=-0.5):
+    """Keys cubic convolution kernel"""
+    t = np.abs(t)
+    t2, t3 = t * t, t * t * t
+    near = (a + 2) * t3 - (a + 3) * t2 + 1
+    far = a * t3 - 5 * a * t2 + 8 * a * t - 4 * a
+    return np.where(t <= 1, near, np.where(t < 2, far, 0.0))
+
+def _bicubic_axis(src, dst):
+    x = (np.arange(dst) + 0.5) * (src / dst) - 0.5
+    x0 = np.floor(x).astype(np.intp)
+    taps = x0[:, None] + np.arange(-1, 3)
+    weights = _cubic(x[:, None] - taps)
+    weights /= weights.sum(axis=1, keepdims=True)
+    # Replicate the edge pixels for taps outside the image
+    idx = np.clip(taps, 0, src - 1)
+    return idx, weights
+
+_AXIS_TABLES = {"nearest": _nearest_axis, "bilinear": _bilinear_axis, "bicubic": _bicubic_axis}
+
+@lru_cache(maxsize=64)
+def resample_tables(src_shape, target_shape, method):
+    """Index and weight tables (rows, columns) for one (source shape, target shape, method).
+
+    Each table is (idx, weights) of shape (target, taps). Cached, so resizing
+    a stream of equal-size frames builds them only once.
+    """
+    if method not in _AXIS_TABLES:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+    tables = []
+    for src, dst in zip(src_shape, target_shape):
+        idx, weights = _AXIS_TABLES[method](src, dst)
+        idx.setflags(write=False)
+        weights.setflags(write=False)
+        tables.append((idx, weights))
+    return tuple(tables)
+
+def _apply_axis(image, idx, weights, axis):
+    """Weighted gather along one axis: out[i] = sum_k weights[i, k] * image[idx[i, k]]"""
+    shape = [1] * image.ndim
+    shape[axis] = idx.shape[0]
+    out = None
+    for k in range(idx.shape[1]):
+        term = np.take(image, idx[:, k], axis=axis) * weights[:, k].reshape(shape)
+        out = term if out is None else out + term
+    return out
+
+def resize(image, target_shape, method="nearest"):
+    """Resize a 2-D (or H x W x C) image to target_shape = (rows, columns)"""
+    target_shape = tuple(int(s) for s in target_shape)
+    (row_idx, row_w), (col_idx, col_w) = resample_tables(image.shape[:2], target_shape, method)
+
+    if method == "nearest":
+        return image[row_idx[:, 0][:, None], col_idx[:, 0][None, :]]
+
+    out = _apply_axis(np.asarray(image, dtype=np.float64), row_idx, row_w, axis=0)
+    out = _apply_axis(out, col_idx, col_w, axis=1)
+
+    if np.issubdtype(image.dtype, np.integer):
+        info = np.iinfo(image.dtype)
+        return np.clip(np.round(out), info.min, info.max).astype(image.dtype)
+    return out.astype(image.dtype)
@@ -0,0 +1,71 @@
+import numpy as np
+from scipy import fft
+
+from imgproc.border import pad
+
+PRECISIONS = (np.float32, np.float64)
+
+def _real_dtype(dtype):
+    dtype = np.dtype(dtype)
+    if dtype not in [np.dtype(p) for p in PRECISIONS]:
+        raise ValueError(f"Unsupported precision {dtype}, expected float32 or float64")
+    return dtype
+
+def fast_shape(shape):
+    """Smallest shape >= `shape` whose real FFT lengths factor into small primes"""
+    return tuple(fft.next_fast_len(int(n), real=True) for n in shape)
+
+def rfft2(image, shape=None, dtype=np.float64, workers=None):
+    """Half spectrum (rows x cols // 2 + 1) of a real image; float32 input gives complex64.
+
+    `shape` zero-pads the transform, as the `s` argument of scipy.fft.rfft2.
+    """
+    image = np.asarray(image, dtype=_real_dtype(dtype))
+    return fft.rfft2(image, s=shape, workers=workers)
+
+def irfft2(spectrum, shape, workers=None):
+    """Real image of `shape` from its half spectrum"""
+    return fft.irfft2(spectrum, s=shape, workers=workers)
+
+def full_magnitude(half, cols):
+    """|F| over the full spectrum, rebuilt from the rfft2 half with |F(u, v)| = |F(-u, -v)|"""
+    magnitude = np.abs(half)
+    rows = magnitude.shape[0]
+    full = np.empty((rows, cols), dtype=magnitude.dtype)
+    full[:, :magnitude.shape[1]] = magnitude
+    # Columns past the half: v -> cols - v, u -> -u (mod rows)
+    missing = cols - magnitude.shape[1]
+    if missing:
+        mirrored = magnitude[(-np.arange(rows)) % rows]
+        full[:, magnitude.shape[1]:] = mirrored[:, missing:0:-1]
+    return full
+
+class Spectrum:
+    """Real FFT of an image, with the display forms computed only when asked for.
+
+    pad_to_fast pads the image (border mode `mode`) up to fast_shape
+    before transforming; inverse() crops back to the original size. For an
+    unpadded image the half spectrum is exactly the left half of fft2.
+    """
+
+    def __init__(self, image, dtype=np.float64, workers=None, pad_to_fast=False, mode="nearest"):
+        image = np.asarray(image)
+        self.image_shape = image.shape
+        self.workers = workers
+        if pad_to_fast:
+            target = fast_shape(image.shape)
+            image = pad(image, [(0, t - n) for n, t in zip(image.shape, target)], mode=mode)
+        self.shape = image.shape
+        self.half = rfft2(image, dtype=dtype, workers=workers)
+        self._magnitude = None
+
+    def magnitude(self, shifted=True):
+        """Full |F|, DC in the center when shifted (built on first call, then cached)"""
+        if self._magnitude is None:
+            self._magnitude = full_magnitude(self.half, self.shape[1])
+        return fft.fftshift(self._magnitude) if shifted else self._magnitude
+
+    def inverse(self, spectrum=None):
+        """Image from the half spectrum (or a filtered copy of it), cropped to the input size"""
+        image = irfft2(self.half if spectrum is None else spectrum, self.shape, self.workers)
+        return image[:self.image_shape[0], :self.image_shape[1]]
@@ -0,0 +1,115 @@
+import os
+import tempfile
+
+import numpy as np
+
+from imgproc.homework import load_homework
+from imgproc.raw_io import create_raw, load_raw
+
+STRIP_ROWS = 256
+
+def strip_bounds(rows, strip_rows, halo, valid=False):
+    """Yield (out_start, out_stop, in_start, in_stop) for every horizontal strip.
+
+    'same' filters keep the image size, so a strip needs `halo` extra rows on
+    each side (fewer at the image border, where the filter pads by itself).
+    'valid' filters drop `halo` rows at each border, so output row r reads
+    input rows r .. r + 2 * halo.
+    """
+    out_rows = rows - 2 * halo if valid else rows
+    for out_start in range(0, out_rows, strip_rows):
+        out_stop = min(out_start + strip_rows, out_rows)
+        if valid:
+            yield out_start, out_stop, out_start, out_stop + 2 * halo
+        else:
+            yield out_start, out_stop, max(out_start - halo, 0), min(out_stop + halo, rows)
+
+def _filter_strips(image, func, halo, strip_rows, valid):
+    """Run func on every strip (with halo) and yield (out_start, out_stop, result)"""
+    for out_start, out_stop, in_start, in_stop in strip_bounds(image.shape[0], strip_rows, halo, valid):
+        strip = np.asarray(image[in_start:in_stop])
+        filtered = func(strip)
+
+        # Drop the halo rows, they were only needed as filter support
+        skip = 0 if valid else out_start - in_start
+        yield out_start, out_stop, filtered[skip:skip + out_stop - out_start]
+
+def stream_filter(src, dst, func, halo, strip_rows=STRIP_ROWS, valid=False, rescale=False):
+    """Filter a raw image strip by strip and write the result to a memory-mapped raw file.
+
+    func must treat rows independently of where the strip starts (any filter
+    whose border handling only pads at the image edges does). With
+    rescale=True func returns the unscaled response and the output is
+    stretched to 0-255 with the global min/max, in a second pass over a
+    scratch file.
+    """
+    image = load_raw(src) if isinstance(src, (str, os.PathLike)) else src
+    rows = image.shape[0]
+    out_rows = rows - 2 * halo if valid else rows
+
+    strips = _filter_strips(image, func, halo, strip_rows, valid)
+    if not rescale:
+        out = None
+        for out_start, out_stop, filtered in strips:
+            if out is None:
+                out = create_raw(dst, (out_rows,) + filtered.shape[1:], filtered.dtype)
+            out[out_start:out_stop] = filtered
+            out.flush()
+        return out
+
+    # 1. Unscaled response into a scratch file, tracking the global range
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = None
+        low, high = np.inf, -np.inf
+        for out_start, out_stop, filtered in strips:
+            if scratch is None:
+                scratch = create_raw(os.path.join(tmp, "scratch"), (out_rows,) + filtered.shape[1:], filtered.dtype)
+            scratch[out_start:out_stop] = filtered
+            low = min(low, filtered.min())
+            high = max(high, filtered.max())
+        scratch.flush()
+
+        # 2. Same shift and stretch as rescale_to_uint8 in hw4/hw_a.py
+        # (max(x - low) == high - low, so every strip gets the global scale)
+        shifted_max = high - low
+        out = create_raw(dst, scratch.shape, np.uint8)
+        for start in range(0, out_rows, strip_rows):
+            strip = np.array(scratch[start:start + strip_rows])
+            strip -= low
+            if shifted_max > 0:
+                strip *= (255.0 / shifted_max)
+            out[start:start + strip_rows] = strip.astype(np.uint8)
+            out.flush()
+        del scratch
+    return out
+
+def _jeff_filter(method):
+    return lambda strip, size: getattr(load_homework("hw5/jeff.py").Filter, method)(strip, size)
+
+def _window_halo(size):
+    return size // 2
+
+def _laplacian_halo(size):
+    return 1
+
+# name -> (function(strip, size), halo(size), valid, rescale)
+FILTERS = {
+    "average": (lambda strip, size: load_homework("hw3/hw_a.py").apply_averaging_filter(strip, size), _window_halo, False, False),
+    "median": (lambda strip, size: load_homework("hw3/hw_b.py").apply_median_filter(strip, size), _window_halo, False, False),
+    "laplacian": (lambda strip, size: load_homework("hw4/hw_a.py").laplacian_response(strip), _laplacian_halo, True, True),
+    "mean": (_jeff_filter("mean"), _window_halo, False, False),
+    "geo_mean": (_jeff_filter("geo_mean"), _window_halo, False, False),
+    "harmonic": (_jeff_filter("harmonic"), _window_halo, False, False),
+    "jeff_median": (_jeff_filter("median"), _window_halo, False, False),
+    "max": (_jeff_filter("max"), _window_halo, False, False),
+    "min": (_jeff_filter("min"), _window_halo, False, False),
+    "midpoint": (_jeff_filter("midpoint"), _window_halo, False, False),
+}
+
+def stream_named_filter(src, dst, name, size=11, strip_rows=STRIP_ROWS):
+    """Stream one of the homework filters in FILTERS over a raw file"""
+    if name not in FILTERS:
+        raise ValueError(f"Unknown filter '{name}', expected one of {sorted(FILTERS)}")
+    func, halo, valid, rescale = FILTERS[name]
+    return stream_filter(src, dst, lambda strip: func(strip, size), halo(size),
+                         strip_rows=strip_rows, valid=valid, rescale=rescale)
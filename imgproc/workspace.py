@@ -0,0 +1,46 @@
+import numpy as np
+
+class Workspace:
+    """Named scratch buffers, reused by every call that asks for the same name, shape and dtype.
+
+    Pass one Workspace to a filter for every frame of an equal-size stream
+    and its intermediates are allocated on the first frame only. A buffer
+    is only valid until the next call that asks for the same name.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name, shape, dtype=np.float64):
+        key = (name, tuple(shape), np.dtype(dtype))
+        if key not in self._buffers:
+            self._buffers[key] = np.empty(shape, dtype=dtype)
+        return self._buffers[key]
+
+    @property
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def clear(self):
+        self._buffers.clear()
+
+def scratch(workspace, name, shape, dtype=np.float64):
+    """Buffer from the workspace, or a fresh one without a workspace"""
+    if workspace is None:
+        return np.empty(shape, dtype=dtype)
+    return workspace.get(name, shape, dtype)
+
+def to_dtype(values, dtype=np.uint8, out=None):
+    """Round, clip to the range of an integer dtype and cast, in one buffer.
+
+    Same result as np.clip(np.round(values), lo, hi).astype(dtype), but the
+    rounding and clipping happen in place in `values` (a float scratch
+    array) and the cast is written into `out` when given.
+    """
+    info = np.iinfo(dtype)
+    np.rint(values, out=values)
+    np.clip(values, info.min, info.max, out=values)
+    if out is None:
+        return values.astype(dtype)
+    np.copyto(out, values, casting="unsafe")
+    return out